@@ -1,17 +1,32 @@
 import asyncio
 import httpx
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.models import OAuthFlows, OAuthFlowAuthorizationCode
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.src.config.config import settings
 from app.src.database.connect import session_manager
 from app.src.database.db import db
+from app.src.database.lazy_session import lazy_session_stats
+from app.src.database.pool import pool_stats
+from app.src.database.replicas import pin_primary, track_writes
+from app.src.database.statement_metrics import statement_metrics
+from app.src.database.timeouts import is_query_canceled
+from app.src.repository.books_count import count_cache
+from app.src.repository.books_facets import facets_cache
+from app.src.repository.books_filter import statement_cache
 from app.src.routes import books, review, auth
+from app.src.services.catalog_refresher import catalog_refresher
+from app.src.services.query_guard import catalog_query_limiter
+from app.src.services.response_cache import response_cache
+from app.src.services.single_flight import catalog_flight
+from app.src.services.suggest import suggest_index
 
 app = FastAPI()
 
@@ -27,6 +42,27 @@ app.add_middleware(
 
 app.add_middleware(SessionMiddleware, secret_key=settings.secret_key)
 
+
+@app.exception_handler(DBAPIError)
+async def database_error_handler(request: Request, error: DBAPIError):
+    # statement_timeout маршруту вичерпано: це не збій БД, а надто дорогий запит
+    if is_query_canceled(error):
+        return JSONResponse(status_code=504, content={"detail": "Query timed out"})
+    print(f"Database error: {error}")
+    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    # Після запиту, що зробив commit, читання цього клієнта якийсь час ідуть на primary,
+    # щоб він не побачив свої зміни відсутніми через відставання репліки
+    writes = track_writes()
+    response = await call_next(request)
+    if writes["wrote"]:
+        pin_primary(response, settings.db_read_your_writes_window)
+    return response
+
+
 app.include_router(auth.router, prefix="/api")
 app.include_router(books.router, prefix="/products")
 app.include_router(review.router, prefix="/reviews")
@@ -67,6 +103,19 @@ async def check_database_health():
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(check_database_health())
+    try:
+        await suggest_index.rebuild()
+        print(f"Suggest index built: {len(suggest_index)} books")
+    except Exception as e:
+        print(f"Suggest index build failed: {e}")
+    try:
+        refreshed = await catalog_refresher.sweep()
+        print(f"Catalog read model refreshed: {refreshed} books")
+    except Exception as e:
+        print(f"Catalog refresh failed: {e}")
+    catalog_refresher.start()
+    await session_manager.replicas.check()
+    session_manager.replicas.start()
 
 
 @app.get("/")
@@ -79,6 +128,30 @@ async def head_root():
     return {}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    # Статистика кешів процесу (для кожного воркера окремо)
+    return {
+        "caches": {
+            "books_response": response_cache.stats(),
+            "books_count": count_cache.stats(),
+            "books_facets": facets_cache.stats(),
+        },
+        "single_flight": {"books_listing": catalog_flight.stats()},
+        "db_pool": {
+            name: pool_stats(engine) for name, engine in session_manager.engines.items()
+        },
+        "db_replicas": session_manager.replicas.stats(),
+        "db_sessions": lazy_session_stats.stats(),
+        "catalog_queries": catalog_query_limiter.stats(),
+        "statements": {
+            "compiled_cache": statement_metrics.stats(),
+            "books_statement_cache": statement_cache.stats(),
+        },
+        "suggest_index": {"books": len(suggest_index)},
+    }
+
+
 @app.get("/api/healthchecker")
 async def healthchecker(session: AsyncSession = Depends(db)):
     try:
@@ -0,0 +1,14 @@
+import asyncio
+
+from app.src.database.connect import session_manager
+from app.src.repository.catalog import refresh_catalog_books
+
+
+async def main():
+    async with session_manager.session() as session:
+        books_count = await refresh_catalog_books(session)
+    print(f"Catalog read model rebuilt for {books_count} books")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
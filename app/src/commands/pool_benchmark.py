@@ -0,0 +1,66 @@
+import asyncio
+import sys
+import time
+
+from app.src.config.config import settings
+from app.src.database.connect import DataBaseSessionManager
+from app.src.repository.books import get_all_books
+
+CONCURRENCY = 50
+DURATION = 10.0
+
+# Типові запити каталогу: однакова форма, різні значення фільтрів
+FILTER_PARAMS = [
+    {"sort_by": "actual_price", "sort_order": "asc"},
+    {"actual_price_min": 100, "actual_price_max": 400, "sort_by": "rate"},
+    {"search": "казка", "sort_by": "relevance", "sort_order": "desc"},
+]
+
+
+def pgbouncer_url() -> str:
+    # PgBouncer з docker-compose (profile pgbouncer) слухає localhost:6432
+    return (
+        f"postgresql+asyncpg://{settings.postgres_user}:{settings.postgres_password}"
+        f"@{settings.postgres_host}:6432/{settings.postgres_db}"
+    )
+
+
+async def run(manager: DataBaseSessionManager) -> tuple:
+    done, errors, last_error = 0, 0, None
+    deadline = time.perf_counter() + DURATION
+
+    async def worker(n: int):
+        nonlocal done, errors, last_error
+        i = n
+        while time.perf_counter() < deadline:
+            # Як HTTP-запит: окрема сесія на кожну сторінку каталогу
+            try:
+                async with manager.session() as session:
+                    await get_all_books(
+                        session, 20, 0, FILTER_PARAMS[i % len(FILTER_PARAMS)]
+                    )
+                done += 1
+            except Exception as e:
+                errors, last_error = errors + 1, e
+            i += 1
+
+    await asyncio.gather(*(worker(n) for n in range(CONCURRENCY)))
+    await manager.engine.dispose()
+    if last_error is not None:
+        print(f"{manager.pool_mode}: {last_error}")
+    return done / DURATION, errors
+
+
+async def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else pgbouncer_url()
+    print(f"{CONCURRENCY} concurrent clients, {DURATION:.0f}s per mode")
+    for name, manager in (
+        ("direct (internal pool)", DataBaseSessionManager(settings.db_url)),
+        ("pgbouncer (NullPool)", DataBaseSessionManager(url, pool_mode="pgbouncer")),
+    ):
+        throughput, errors = await run(manager)
+        print(f"{name:<24} {throughput:8.1f} pages/s, errors: {errors}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
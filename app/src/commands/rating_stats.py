@@ -0,0 +1,14 @@
+import asyncio
+
+from app.src.database.connect import session_manager
+from app.src.repository.review import rebuild_rating_stats
+
+
+async def main():
+    async with session_manager.session() as session:
+        books_count = await rebuild_rating_stats(session)
+    print(f"Rating stats rebuilt for {books_count} books")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
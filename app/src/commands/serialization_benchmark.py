@@ -0,0 +1,129 @@
+import json
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from app.src.entity import enums
+from app.src.repository.books import BOOK_VIEWS
+from app.src.schemas.books import BookPaginationResponse, BookResponse
+from app.src.services.serialization import dumps
+
+PAGE_SIZE = 100
+REVIEWS_PER_BOOK = 3
+ROUNDS = 200
+
+
+def make_page():
+    # Рядки у формі, яку повертає get_all_books: ключі camelCase, Decimal/Enum/UUID з БД
+    now = datetime.utcnow()
+    books = []
+    for i in range(PAGE_SIZE):
+        book_id = uuid.uuid4()
+        book = {
+            "bookId": book_id,
+            "title": f"Книга {i}",
+            "author": "Автор",
+            "originalTitle": None,
+            "genre": enums.GenreEnum.fairy_tales,
+            "categories": [enums.CategoriesEnum.children_literature],
+            "targetAges": [enums.TargetAgesEnum.age_5_8, enums.TargetAgesEnum.age_8_12],
+            "series": None,
+            "publisher": "Видавництво",
+            "publicationYear": 2020,
+            "bookType": [enums.BookTypeEnum.paperback],
+            "pageCount": 64,
+            "paperType": enums.PaperTypeEnum.offset,
+            "language": enums.LanguageEnum.ukrainian,
+            "originalLanguage": enums.LanguageEnum.ukrainian,
+            "translator": None,
+            "coverType": enums.CoverTypeEnum.hard,
+            "weight": Decimal("320.50"),
+            "dimensions": "200x260",
+            "isbn": f"978-617-000-{i:03d}",
+            "articleNumber": f"A-{i}",
+            "price": Decimal("250"),
+            "actualPrice": Decimal("225"),
+            "discount": Decimal("0.10"),
+            "stockQuantity": 7,
+            "description": "Опис " * 200,
+            "images": [
+                f"https://img.example/{i}-1.jpg",
+                f"https://img.example/{i}-2.jpg",
+            ],
+            "reviewCount": 12,
+            "isBestseller": i % 7 == 0,
+            "isPublish": True,
+            "isGifted": False,
+            "isAvailable": True,
+            "createdAt": now,
+            "updatedAt": now,
+            "rate": Decimal("4.50"),
+            "reviews": [
+                {
+                    "id": uuid.uuid4(),
+                    "userId": uuid.uuid4(),
+                    "bookId": book_id,
+                    "reviewText": "Чудова книга для дітей " * 5,
+                    "rate": 5.0,
+                    "reviewDate": now,
+                    "createdAt": now,
+                    "updatedAt": now,
+                    "reviewName": "Олена",
+                    "avatar": "https://img.example/avatar.png",
+                }
+                for _ in range(REVIEWS_PER_BOOK)
+            ],
+            "totalSales": None,
+            "orders": None,
+        }
+        books.append(book)
+    return books
+
+
+def page_payload(books):
+    return {
+        "totalBooks": 1000,
+        "totalPages": 10,
+        "currentPage": 1,
+        "size": PAGE_SIZE,
+        "books": books,
+        "hasNext": True,
+        "nextCursor": None,
+    }
+
+
+def pydantic_path(books) -> bytes:
+    # Як було: BookResponse для кожного рядка, потім FastAPI валідує response_model ще раз
+    response = BookPaginationResponse(
+        **page_payload([BookResponse(**book) for book in books])
+    )
+    content = BookPaginationResponse.model_validate(response.model_dump(by_alias=True))
+    return json.dumps(content.model_dump(mode="json", by_alias=True)).encode()
+
+
+def fast_path(books) -> bytes:
+    return dumps(page_payload(books))
+
+
+def measure(fn, books) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(books)
+    return PAGE_SIZE * ROUNDS / (time.perf_counter() - started)
+
+
+def main():
+    books = make_page()
+    assert list(books[0]) == list(BOOK_VIEWS["full"])
+    # Обидва шляхи мають давати однаковий JSON
+    assert json.loads(pydantic_path(books)) == json.loads(fast_path(books))
+    before = measure(pydantic_path, books)
+    after = measure(fast_path, books)
+    print(f"{PAGE_SIZE} books x {REVIEWS_PER_BOOK} reviews, {ROUNDS} rounds")
+    print(f"pydantic + response_model: {before:,.0f} rows/s")
+    print(f"trusted rows + orjson:     {after:,.0f} rows/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
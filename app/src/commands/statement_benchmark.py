@@ -0,0 +1,97 @@
+import time
+
+from sqlalchemy.dialects import postgresql
+
+from app.src.repository.books import _build_listing_statements, resolve_book_fields
+from app.src.repository.books_filter import (
+    DynamicFilterFactory,
+    filter_params_values,
+    filter_shape,
+)
+
+ROUNDS = 2000
+
+# Типовий запит каталогу: пошук, кілька фільтрів і сортування
+FILTER_PARAMS = {
+    "search": "казка",
+    "genre": "Класика",
+    "categories": "Дитяча література",
+    "actual_price_min": 100,
+    "actual_price_max": 500,
+    "sort_by": "actual_price",
+    "sort_order": "asc",
+}
+
+dialect = postgresql.asyncpg.dialect()
+
+
+def build_statements(filter_params):
+    dynamic_factory = DynamicFilterFactory(filter_params)
+    filters = dynamic_factory.create_filters_by_param()
+    sort_filter = dynamic_factory.create_sort_filter()
+    return filters, sort_filter
+
+
+def rebuild_and_compile(filter_params, cache):
+    # Без кешів: запит будується і компілюється на кожен запит
+    filters, sort_filter = build_statements(filter_params)
+    _, query = _build_listing_statements(
+        filters.values(), sort_filter, False, "card", resolve_book_fields("card")
+    )
+    return query.compile(dialect=dialect)
+
+
+def rebuild_with_compiled_cache(filter_params, cache):
+    # Як було: запит будується щоразу, SQLAlchemy знаходить SQL за ключем структури
+    filters, sort_filter = build_statements(filter_params)
+    _, query = _build_listing_statements(
+        filters.values(), sort_filter, False, "card", resolve_book_fields("card")
+    )
+    key = query._generate_cache_key().key
+    compiled = cache.get(key)
+    if compiled is None:
+        compiled = cache[key] = query.compile(dialect=dialect)
+    return compiled
+
+
+def statement_cache_path(filter_params, cache):
+    # Як стало: готовий запит за формою фільтрів, значення — лише параметри
+    filters, sort_filter = build_statements(filter_params)
+    book_fields = resolve_book_fields("card")
+    shape = (filter_shape(filters), sort_filter.cursor_scope, False, "card")
+    query = cache.get(shape)
+    if query is None:
+        _, query = _build_listing_statements(
+            filters.values(), sort_filter, False, "card", book_fields
+        )
+        cache[shape] = query
+    params = filter_params_values(filters.values())
+    params.update(sort_filter.params())
+    key = query._generate_cache_key().key
+    compiled = cache.get(key)
+    if compiled is None:
+        compiled = cache[key] = query.compile(dialect=dialect)
+    return compiled, params
+
+
+def measure(fn) -> float:
+    cache = {}
+    fn(FILTER_PARAMS, cache)
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(FILTER_PARAMS, cache)
+    return (time.perf_counter() - started) / ROUNDS * 1_000_000
+
+
+def main():
+    print(f"Python overhead per listing request, {ROUNDS} rounds")
+    for name, fn in (
+        ("build + compile", rebuild_and_compile),
+        ("build + compiled cache", rebuild_with_compiled_cache),
+        ("statement cache", statement_cache_path),
+    ):
+        print(f"{name:<24} {measure(fn):8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,54 @@ class Settings(BaseSettings):
     google_client_secret: str
     google_redirect_uri: str
 
+    # Підрахунок total_books у каталозі
+    books_count_cache_ttl: int = 60
+    books_count_estimate_threshold: int = 10_000
+    books_facets_cache_ttl: int = 60
+
+    # Кеш відповідей каталогу в пам'яті процесу
+    response_cache_ttl: int = 30
+    response_cache_max_entries: int = 2048
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    single_flight_timeout: float = 15.0
+    # Таймаут кожного підзапиту складеної сторінки книги
+    book_page_part_timeout: float = 3.0
+
+    # internal — власний пул SQLAlchemy; pgbouncer — NullPool за PgBouncer (transaction pooling)
+    db_pool_mode: str = "internal"
+    # Пул з'єднань на воркер: (pool_size + max_overflow) * воркери < max_connections Postgres
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Репліки для читання: URL через кому (можна вказати ту саму БД ще раз)
+    db_replica_urls: str = ""
+    db_replica_max_lag: float = 5.0
+    db_replica_check_interval: float = 10.0
+    # Скільки секунд після запису читання клієнта йдуть на primary
+    db_read_your_writes_window: float = 5.0
+
+    # Кеш готових запитів каталогу за формою фільтрів і кеші компіляції/prepared statements
+    statement_cache_max_entries: int = 512
+    db_query_cache_size: int = 1200
+    db_prepared_statement_cache_size: int = 500
+
+    # Бюджети statement_timeout (мс): за замовчуванням для запитів API і для важких
+    # запитів каталогу; фонові задачі й команди працюють без обмеження
+    db_statement_timeout_ms: int = 10_000
+    books_listing_statement_timeout_ms: int = 3_000
+    books_facets_statement_timeout_ms: int = 3_000
+    # Одночасні важкі запити каталогу на воркер; надлишок чекає queue_timeout, потім 503
+    catalog_query_concurrency: int = 8
+    catalog_query_queue_timeout: float = 0.2
+    catalog_query_retry_after: int = 1
+
+    # Фонове оновлення catalog_books (секунди)
+    catalog_refresh_delay: float = 1.0
+    catalog_refresh_interval: float = 300.0
+
     # mail_username: str
     # mail_password: str
     # mail_from: str
@@ -34,6 +82,10 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
+    @property
+    def replica_urls(self) -> list:
+        return [url.strip() for url in self.db_replica_urls.split(",") if url.strip()]
+
     @property
     def db_url(self) -> str:
         return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
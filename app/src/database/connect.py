@@ -1,4 +1,6 @@
 import contextlib
+import uuid
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -6,26 +8,144 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
 )
+from sqlalchemy.pool import NullPool
 
 from app.src.config.config import settings
-
+from app.src.database.lazy_session import LazySession
+from app.src.database.pool import InstrumentedAsyncQueuePool, instrument_pool
+from app.src.database.replicas import Replica, ReplicaSet
+from app.src.database.statement_metrics import statement_metrics
+from app.src.database.timeouts import STATEMENT_TIMEOUT_KEY
 
 URI = settings.db_url
 
 
+POOL_MODES = ("internal", "pgbouncer")
+
+
+def _prepared_statement_name() -> str:
+    # Унікальне ім'я: у transaction-режимі PgBouncer наступна транзакція може потрапити
+    # на інше серверне з'єднання, де statement з таким самим ім'ям уже існує
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def _engine_options(pool_mode: str) -> dict:
+    if pool_mode == "pgbouncer":
+        # Пулом керує PgBouncer (transaction pooling): власний пул не потрібен, а prepared
+        # statements не кешуються — серверне з'єднання між транзакціями не гарантоване
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _prepared_statement_name,
+            },
+        }
+    if pool_mode != "internal":
+        raise ValueError(f"Unknown db_pool_mode '{pool_mode}', use one of {POOL_MODES}")
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        # LRU prepared statements asyncpg на з'єднання (ключ — SQL-рядок)
+        "connect_args": {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size
+        },
+    }
+
+
+def _create_engine(url, pool_mode: str = "internal") -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        # Кеш скомпільованого SQL (ключ — структура запиту, без значень параметрів)
+        query_cache_size=settings.db_query_cache_size,
+        **_engine_options(pool_mode),
+    )
+    statement_metrics.instrument(engine)
+    instrument_pool(engine)
+    return engine
+
+
+def _create_session_maker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        autoflush=False, autocommit=False, bind=engine, expire_on_commit=False
+    )
+
+
 class DataBaseSessionManager:
 
-    def __init__(self, url):
-        self._engine: AsyncEngine | None = create_async_engine(url)
-        self._session_maker: async_sessionmaker | None = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine, expire_on_commit=False
+    def __init__(self, url, replica_urls=(), pool_mode: str = "internal"):
+        self.pool_mode = pool_mode
+        self._engine: AsyncEngine | None = _create_engine(url, pool_mode)
+        self._session_maker: async_sessionmaker | None = _create_session_maker(
+            self._engine
         )
+        self.replicas = ReplicaSet(
+            [
+                Replica(f"replica_{i}", _create_engine(replica_url, pool_mode))
+                for i, replica_url in enumerate(replica_urls)
+            ],
+            max_lag=settings.db_replica_max_lag,
+            check_interval=settings.db_replica_check_interval,
+        )
+        # Транзакції на репліках READ ONLY: випадковий запис через db_readonly падає,
+        # навіть якщо «реплікою» налаштована та сама БД
+        self._replica_session_makers = {
+            replica.name: _create_session_maker(
+                replica.engine.execution_options(postgresql_readonly=True)
+            )
+            for replica in self.replicas.replicas
+        }
 
-    @contextlib.asynccontextmanager
-    async def session(self):
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
+    @property
+    def engines(self) -> dict:
+        return {
+            "primary": self._engine,
+            **{replica.name: replica.engine for replica in self.replicas.replicas},
+        }
+
+    def _new_session(
+        self, readonly: bool = False, statement_timeout: Optional[int] = None
+    ) -> AsyncSession:
         if self._session_maker is None:
             raise Exception("Session maker is not initialized")
-        session: AsyncSession = self._session_maker()
+        session_maker = self._session_maker
+        if readonly:
+            # Лише читання: репліка за round-robin, а якщо здорових немає — primary
+            replica = self.replicas.choose()
+            if replica is not None:
+                session_maker = self._replica_session_makers[replica.name]
+        session = session_maker()
+        if statement_timeout:
+            session.info[STATEMENT_TIMEOUT_KEY] = statement_timeout
+        return session
+
+    @contextlib.asynccontextmanager
+    async def session(
+        self, readonly: bool = False, statement_timeout: Optional[int] = None
+    ):
+        session: AsyncSession = self._new_session(readonly, statement_timeout)
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await session.close()
+
+    @contextlib.asynccontextmanager
+    async def lazy_session(
+        self, readonly: bool = False, statement_timeout: Optional[int] = None
+    ):
+        # Сесія (і репліка) обираються при першому зверненні, а не на вході в запит
+        session = LazySession(lambda: self._new_session(readonly, statement_timeout))
         try:
             yield session
         except Exception as e:
@@ -35,4 +155,6 @@ class DataBaseSessionManager:
             await session.close()
 
 
-session_manager = DataBaseSessionManager(URI)
+session_manager = DataBaseSessionManager(
+    URI, settings.replica_urls, settings.db_pool_mode
+)
@@ -1,10 +1,30 @@
 from collections.abc import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.src.config.config import settings
 from app.src.database.connect import session_manager
+from app.src.database.replicas import is_pinned
 
 
 async def db() -> AsyncGenerator[AsyncSession, None]:
-    async with session_manager.session() as session:
+    async with session_manager.lazy_session(
+        statement_timeout=settings.db_statement_timeout_ms
+    ) as session:
         yield session
+
+
+def readonly_db(statement_timeout: int = settings.db_statement_timeout_ms):
+    # Залежність із власним бюджетом statement_timeout для конкретного маршруту
+    async def dependency(request: Request) -> AsyncGenerator[AsyncSession, None]:
+        # GET-маршрути читають з реплік, якщо клієнт щойно нічого не записував
+        async with session_manager.lazy_session(
+            readonly=not is_pinned(request), statement_timeout=statement_timeout
+        ) as session:
+            yield session
+
+    return dependency
+
+
+db_readonly = readonly_db()
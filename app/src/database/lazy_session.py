@@ -0,0 +1,97 @@
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Позначка в session.info: commit робить LazySession, щоб віддати з'єднання, а не запис
+RELEASE_KEY = "lazy_release"
+
+
+class LazySessionStats:
+    def __init__(self):
+        self.opened = 0
+        self.unused = 0
+        self.releases = 0
+
+    def stats(self) -> dict:
+        return {
+            "opened": self.opened,
+            "unused": self.unused,
+            "early_releases": self.releases,
+        }
+
+
+lazy_session_stats = LazySessionStats()
+
+
+class LazySession:
+    """
+    Проксі AsyncSession для залежностей FastAPI. Сесія створюється лише при першому
+    зверненні, тож запити, що впали на авторизації чи валідації, пул не займають.
+
+    Усі читання запиту йдуть в одній транзакції. Коли фаза читання закінчилась,
+    маршрут викликає release(): якщо транзакція нічого не змінювала, вона
+    завершується і з'єднання повертається в пул ще до серіалізації відповіді.
+    Записи відстежуються подіями сесії (flush, DML, text(), SELECT ... FOR UPDATE),
+    тож транзакцію з ними release() не чіпає.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self._session_factory = session_factory
+        self._session: Optional[AsyncSession] = None
+        self._keep = False
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+            self._listen(self._session.sync_session)
+            lazy_session_stats.opened += 1
+        return self._session
+
+    def __getattr__(self, name):
+        # execute, get, add, commit, flush, info, ... — напряму в справжню сесію
+        return getattr(self.session, name)
+
+    def _listen(self, sync_session) -> None:
+        @event.listens_for(sync_session, "do_orm_execute")
+        def _on_execute(orm_execute_state):
+            # Лише звичайний SELECT можна завершити commit-ом без наслідків;
+            # DML, text() і блокування рядків залишають транзакцію відкритою
+            if (
+                not orm_execute_state.is_select
+                or orm_execute_state.statement._for_update_arg is not None
+            ):
+                self._keep = True
+
+        @event.listens_for(sync_session, "after_flush")
+        def _on_flush(session, flush_context):
+            self._keep = True
+
+        @event.listens_for(sync_session, "after_transaction_end")
+        def _on_transaction_end(session, transaction):
+            if transaction.parent is None:
+                self._keep = False
+
+    async def release(self) -> None:
+        session = self._session
+        if session is None or not session.in_transaction():
+            return
+        if self._keep or session.new or session.dirty or session.deleted:
+            return
+        session.info[RELEASE_KEY] = True
+        try:
+            await session.commit()
+        finally:
+            session.info.pop(RELEASE_KEY, None)
+        lazy_session_stats.releases += 1
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is None:
+            lazy_session_stats.unused += 1
+            return
+        await self._session.close()
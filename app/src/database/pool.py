@@ -0,0 +1,120 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Межі гістограми очікування з'єднання (секунди)
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0)
+
+
+class PoolMetrics:
+    """
+    Тиск на пул з'єднань: скільки чекали на checkout, скільки разів пул виходив
+    за pool_size (overflow) і впирався в pool_timeout, пік зайнятих з'єднань.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.in_use_peak = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        for i, bound in enumerate(WAIT_BUCKETS):
+            if seconds < bound:
+                self.wait_buckets[i] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+
+    def stats(self) -> dict:
+        labels = [f"<{bound * 1000:g}ms" for bound in WAIT_BUCKETS]
+        labels.append(f">={WAIT_BUCKETS[-1] * 1000:g}ms")
+        return {
+            "checkouts": self.checkouts,
+            "wait_avg_ms": (
+                round(self.wait_total / self.checkouts * 1000, 3)
+                if self.checkouts
+                else None
+            ),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "wait_histogram": dict(zip(labels, self.wait_buckets)),
+            "overflow_checkouts": self.overflow_checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "in_use_peak": self.in_use_peak,
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    # Час checkout (включно з очікуванням вільного з'єднання чи створенням нового)
+    # вимірюється навколо _do_get: подій пулу «початок очікування» немає
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # Після dispose() пул створюється заново — накопичена статистика зберігається
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe_wait(time.perf_counter() - started)
+        # Лише checkout, що відкрив нове з'єднання понад pool_size
+        if self.overflow() > max(overflow, 0):
+            self.metrics.overflow_checkouts += 1
+        self.metrics.in_use_peak = max(self.metrics.in_use_peak, self.checkedout())
+        return connection
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedAsyncQueuePool):
+        # NullPool (режим pgbouncer): пулом керує зовнішній пулер
+        return
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        engine.sync_engine.pool.metrics.connects += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        engine.sync_engine.pool.metrics.invalidations += 1
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    stats = {"status": pool.status()}
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # Від'ємне значення — ще не всі з'єднання pool_size відкриті
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                **pool.metrics.stats(),
+            }
+        )
+    return stats
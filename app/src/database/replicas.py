@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.src.database.lazy_session import RELEASE_KEY
+
+# Cookie, що на короткий час після запису направляє читання клієнта на primary
+PIN_COOKIE = "db_primary_pin"
+
+# Відставання репліки в секундах. На primary (або тій самій БД, налаштованій як
+# репліка) pg_is_in_recovery() = false, і відставання 0. Якщо все отримане WAL
+# уже застосовано, репліка актуальна навіть коли останню транзакцію програно давно.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """)
+
+_request_writes: ContextVar[Optional[dict]] = ContextVar("request_writes", default=None)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        # До першої перевірки репліка вважається здоровою
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.reads = 0
+
+
+class ReplicaSet:
+    """
+    Репліки для читання: round-robin між здоровими репліками, відставання яких
+    не перевищує max_lag. Якщо таких немає — читання йде на primary.
+    """
+
+    def __init__(self, replicas: list, max_lag: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_fallbacks = 0
+        self._next = itertools.cycle(range(len(replicas))) if replicas else None
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            if replica.healthy:
+                replica.reads += 1
+                return replica
+        if self.replicas:
+            self.primary_fallbacks += 1
+        return None
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                lag = float(await connection.scalar(REPLICA_LAG_QUERY))
+        except Exception as e:
+            replica.healthy, replica.lag, replica.error = False, None, str(e)
+            return
+        replica.lag, replica.error = lag, None
+        replica.healthy = lag <= self.max_lag
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stats(self) -> Dict:
+        return {
+            "max_lag": self.max_lag,
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": {
+                replica.name: {
+                    "healthy": replica.healthy,
+                    "lag": replica.lag,
+                    "error": replica.error,
+                    "reads": replica.reads,
+                }
+                for replica in self.replicas
+            },
+        }
+
+
+# ----------------------------- read-your-writes -----------------------------
+def track_writes() -> dict:
+    # Викликається на початку запиту; сесії, що зробили commit, позначають прапорець
+    writes = {"wrote": False}
+    _request_writes.set(writes)
+    return writes
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_request_write(session):
+    writes = _request_writes.get()
+    # Commit від LazySession лише віддає з'єднання після читання — це не запис
+    if writes is not None and not session.info.get(RELEASE_KEY):
+        writes["wrote"] = True
+
+
+def pin_primary(response: Response, window: float) -> None:
+    response.set_cookie(
+        PIN_COOKIE, "1", max_age=int(window), httponly=True, samesite="lax"
+    )
+
+
+def is_pinned(request: Request) -> bool:
+    return PIN_COOKIE in request.cookies
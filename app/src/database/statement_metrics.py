@@ -0,0 +1,44 @@
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCacheMetrics:
+    """
+    Лічильники кешу компіляції SQLAlchemy: для кожного виконаного запиту
+    ExecutionContext.cache_hit показує, чи SQL узято з кешу, чи скомпільовано заново.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self._engines = []
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        self._engines.append(engine.sync_engine)
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            self.counts[context.cache_hit] += 1
+
+    def stats(self) -> dict:
+        hits = self.counts[CacheStats.CACHE_HIT]
+        misses = self.counts[CacheStats.CACHE_MISS]
+        return {
+            "hits": hits,
+            "misses": misses,
+            # Запити без ключа кешу (text(), конструкції без cache key) компілюються щоразу
+            "uncached": self.counts[CacheStats.NO_CACHE_KEY]
+            + self.counts[CacheStats.CACHING_DISABLED],
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "entries": sum(
+                len(engine._compiled_cache)
+                for engine in self._engines
+                if engine._compiled_cache is not None
+            ),
+        }
+
+
+statement_metrics = StatementCacheMetrics()
@@ -0,0 +1,22 @@
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+# Ключ session.info з бюджетом на один SQL-запит, мс
+STATEMENT_TIMEOUT_KEY = "statement_timeout"
+
+# SQLSTATE query_canceled: statement_timeout або скасування запиту
+QUERY_CANCELED = "57014"
+
+
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    # SET LOCAL діє до кінця транзакції: не «протікає» в інші запити через пул
+    # чи PgBouncer, а нова транзакція сесії отримує його знову
+    timeout = session.info.get(STATEMENT_TIMEOUT_KEY)
+    if timeout:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def is_query_canceled(error: DBAPIError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == QUERY_CANCELED
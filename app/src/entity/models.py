@@ -2,6 +2,7 @@ import uuid
 from sqlalchemy import (
     Column,
     Integer,
+    BigInteger,
     String,
     ForeignKey,
     Numeric,
@@ -9,9 +10,11 @@ from sqlalchemy import (
     DateTime,
     func,
     Enum,
+    Index,
+    Computed,
 )
 from sqlalchemy.orm import declarative_base, validates, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, ARRAY, ENUM
 
 from app.src.entity import enums
 
@@ -31,6 +34,11 @@ class Category(Base):
     category = Column(Enum(enums.CategoriesEnum), nullable=False, index=True)
     book = relationship("Book", back_populates="categories")
 
+    __table_args__ = (
+        # Дочірні рядки книги (завантаження зв'язків, перевірка значення) — одним index-only scan
+        Index("ix_categories_book_id_category", "book_id", "category"),
+    )
+
 
 class TargetAge(Base):
     __tablename__ = "target_ages"
@@ -45,6 +53,10 @@ class TargetAge(Base):
     target_age = Column(Enum(enums.TargetAgesEnum), nullable=False, index=True)
     book = relationship("Book", back_populates="target_ages")
 
+    __table_args__ = (
+        Index("ix_target_ages_book_id_target_age", "book_id", "target_age"),
+    )
+
 
 class BookType(Base):
     __tablename__ = "book_types"
@@ -59,6 +71,8 @@ class BookType(Base):
     book_type = Column(Enum(enums.BookTypeEnum), nullable=False, index=True)
     book = relationship("Book", back_populates="book_types")
 
+    __table_args__ = (Index("ix_book_types_book_id_book_type", "book_id", "book_type"),)
+
 
 class Image(Base):
     __tablename__ = "images"
@@ -69,8 +83,18 @@ class Image(Base):
         unique=True,
         nullable=False,
     )
-    book_id = Column(UUID(as_uuid=True), ForeignKey("books.id"), nullable=False)
+    # Індекс: зображення однієї книги для сторінки книги та її ETag
+    book_id = Column(
+        UUID(as_uuid=True), ForeignKey("books.id"), nullable=False, index=True
+    )
     image_url = Column(String(100), nullable=False, index=True)
+    updated_at = Column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        server_default=func.now(),
+        nullable=False,
+    )
     book = relationship("Book", back_populates="book_images")
 
 
@@ -95,10 +119,33 @@ class Book(Base):
     book_types = relationship(
         "BookType", back_populates="book", cascade="all, delete-orphan"
     )
+    # Денормалізовані копії categories/target_ages/book_types для фільтрів && та @>.
+    # Підтримуються тригерами БД на дочірніх таблицях (див. міграцію)
+    category_values = Column(
+        ARRAY(ENUM(enums.CategoriesEnum, name="categoriesenum", create_type=False)),
+        nullable=False,
+        server_default="{}",
+    )
+    target_age_values = Column(
+        ARRAY(ENUM(enums.TargetAgesEnum, name="targetagesenum", create_type=False)),
+        nullable=False,
+        server_default="{}",
+    )
+    book_type_values = Column(
+        ARRAY(ENUM(enums.BookTypeEnum, name="booktypeenum", create_type=False)),
+        nullable=False,
+        server_default="{}",
+    )
     language = Column(Enum(enums.LanguageEnum), nullable=False, index=True)
     original_language = Column(Enum(enums.LanguageEnum), nullable=False, index=True)
     price = Column(Numeric, index=True, nullable=False, default=0.0)
     discount = Column(Numeric(4, 2), index=True, nullable=False, default=0.0)
+    # Ціна зі знижкою — генерована колонка, тож фільтри й сортування йдуть по індексу
+    actual_price = Column(
+        Numeric,
+        Computed("round(price * (1.0 - discount), 0)", persisted=True),
+        index=True,
+    )
     stock_quantity = Column(Integer, nullable=False, default=1)
     book_images = relationship(
         "Image", back_populates="book", cascade="all, delete-orphan"
@@ -119,6 +166,32 @@ class Book(Base):
     book_info = relationship(
         "BookInfo", back_populates="book", uselist=False, cascade="all, delete"
     )
+    rating_stats = relationship(
+        "BookRatingStats", back_populates="book", uselist=False, cascade="all, delete"
+    )
+    # Підтримується тригерами БД з title, author та books_info (див. міграцію)
+    search_vector = Column(TSVECTOR, nullable=True)
+
+    __table_args__ = (
+        Index("ix_books_category_values", "category_values", postgresql_using="gin"),
+        Index(
+            "ix_books_target_age_values", "target_age_values", postgresql_using="gin"
+        ),
+        Index("ix_books_book_type_values", "book_type_values", postgresql_using="gin"),
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_books_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_books_author_trgm",
+            "author",
+            postgresql_using="gin",
+            postgresql_ops={"author": "gin_trgm_ops"},
+        ),
+    )
 
     @validates("price")
     def validate_price(self, key, value):
@@ -161,9 +234,163 @@ class BookInfo(Base):
         unique=True,
         nullable=False,
     )
+    updated_at = Column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        server_default=func.now(),
+        nullable=False,
+    )
     book = relationship("Book", back_populates="book_info")
 
 
+class BookRatingStats(Base):
+    __tablename__ = "book_rating_stats"
+
+    book_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("books.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rate_sum = Column(Numeric, nullable=False, default=0, server_default="0")
+    avg_rate = Column(
+        Numeric(3, 2), index=True, nullable=False, default=0, server_default="0"
+    )
+    stars_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(
+        DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    book = relationship("Book", back_populates="rating_stats")
+
+
+class CatalogBook(Base):
+    """
+    Денормалізований рядок каталогу на кожну книгу: усі поля BookResponse, крім
+    відгуків. Оновлюється фоново (services/catalog_refresher.py), лістинг читає лише його.
+    """
+
+    __tablename__ = "catalog_books"
+
+    book_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("books.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    title = Column(String(250), nullable=False)
+    author = Column(String(100), nullable=False)
+    original_title = Column(String(250), nullable=True)
+    genre = Column(
+        ENUM(enums.GenreEnum, name="genreenum", create_type=False), nullable=False
+    )
+    categories = Column(
+        ARRAY(ENUM(enums.CategoriesEnum, name="categoriesenum", create_type=False)),
+        nullable=False,
+        server_default="{}",
+    )
+    target_ages = Column(
+        ARRAY(ENUM(enums.TargetAgesEnum, name="targetagesenum", create_type=False)),
+        nullable=False,
+        server_default="{}",
+    )
+    book_type = Column(
+        ARRAY(ENUM(enums.BookTypeEnum, name="booktypeenum", create_type=False)),
+        nullable=False,
+        server_default="{}",
+    )
+    series = Column(String(200), nullable=True)
+    publisher = Column(String(200), nullable=True)
+    publication_year = Column(Integer, nullable=True)
+    page_count = Column(Integer, nullable=True)
+    paper_type = Column(
+        ENUM(enums.PaperTypeEnum, name="papertypeenum", create_type=False),
+        nullable=True,
+    )
+    language = Column(
+        ENUM(enums.LanguageEnum, name="languageenum", create_type=False),
+        nullable=False,
+    )
+    original_language = Column(
+        ENUM(enums.LanguageEnum, name="languageenum", create_type=False),
+        nullable=False,
+    )
+    translator = Column(String(100), nullable=True)
+    cover_type = Column(
+        ENUM(enums.CoverTypeEnum, name="covertypeenum", create_type=False),
+        nullable=True,
+    )
+    weight = Column(Numeric(5, 2), nullable=True)
+    dimensions = Column(String(20), nullable=True)
+    # Пошук у POST /books/batch за ISBN та артикулом
+    isbn = Column(String(50), nullable=True, index=True)
+    article_number = Column(String(50), nullable=True, index=True)
+    price = Column(Numeric, nullable=False)
+    actual_price = Column(Numeric, nullable=True)
+    discount = Column(Numeric(4, 2), nullable=False)
+    stock_quantity = Column(Integer, nullable=False)
+    description = Column(String(1500), nullable=True)
+    images = Column(ARRAY(String(100)), nullable=False, server_default="{}")
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rate = Column(Numeric(3, 2), nullable=False, default=0, server_default="0")
+    is_bestseller = Column(Boolean, nullable=False)
+    is_publish = Column(Boolean, nullable=False)
+    is_gifted = Column(Boolean, nullable=False)
+    is_available = Column(Boolean, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    # Копії updated_at джерел (books, book_rating_stats, books_info, останнього
+    # зображення) на момент оновлення — розбіжність з джерелом означає, що рядок
+    # застарів. Видалення зображення помітне за кількістю елементів images
+    updated_at = Column(DateTime, nullable=False)
+    stats_updated_at = Column(DateTime, nullable=True)
+    info_updated_at = Column(DateTime, nullable=True)
+    images_updated_at = Column(DateTime, nullable=True)
+    # Час оновлення рядка — частина ETag сторінки книги
+    refreshed_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Сортування лістингу + book_id як tie-breaker для курсора
+        Index("ix_catalog_books_actual_price_book_id", "actual_price", "book_id"),
+        Index("ix_catalog_books_created_at_book_id", "created_at", "book_id"),
+        Index("ix_catalog_books_rate_book_id", "rate", "book_id"),
+        # Фільтри лістингу і фасетів накладаються на catalog_books
+        Index("ix_catalog_books_categories", "categories", postgresql_using="gin"),
+        Index("ix_catalog_books_target_ages", "target_ages", postgresql_using="gin"),
+        Index("ix_catalog_books_book_type", "book_type", postgresql_using="gin"),
+        Index(
+            "ix_catalog_books_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_catalog_books_author_trgm",
+            "author",
+            postgresql_using="gin",
+            postgresql_ops={"author": "gin_trgm_ops"},
+        ),
+    )
+
+
+class CatalogState(Base):
+    """
+    Один рядок з версією catalog_books. Тригер БД збільшує version після кожного
+    INSERT/UPDATE/DELETE у catalog_books (включно з каскадним видаленням книги),
+    а також після зміни імені чи аватара користувача (вони є в превʼю відгуків).
+    """
+
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
 class Review(Base):
     __tablename__ = "reviews"
 
@@ -178,7 +405,10 @@ class Review(Base):
     rate = Column(Numeric(3, 1), index=True, nullable=False, default=5.0)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now())
-    review_date = Column(DateTime, default=func.now())
+    # NOT NULL: ключ keyset-пагінації, NULL випадав би з порівняння кортежів
+    review_date = Column(
+        DateTime, default=func.now(), server_default=func.now(), nullable=False
+    )
     book_id = Column(UUID(as_uuid=True), ForeignKey("books.id"), nullable=False)
     user_id = Column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
@@ -187,6 +417,12 @@ class Review(Base):
     book = relationship("Book", back_populates="reviews")
     user = relationship("User", back_populates="reviews")
 
+    __table_args__ = (
+        # Keyset-пагінація відгуків книги: (review_date, id) та сортування за rate
+        Index("ix_reviews_book_id_review_date_id", "book_id", "review_date", "id"),
+        Index("ix_reviews_book_id_rate", "book_id", "rate", "review_date", "id"),
+    )
+
     @validates("rate")
     def validate_rate(self, key, value):
         if value < 0 or value > 5:
@@ -1,270 +1,327 @@
-from typing import List, Tuple
+import uuid
+from typing import List, Optional, Tuple
 
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select, over, cast, Numeric
-
-from app.src.entity import enums
-from app.src.entity.models import (
-    Book,
-    Review,
-    BookInfo,
-    Category,
-    TargetAge,
-    BookType,
-    Image,
-    User,
+from sqlalchemy.orm import aliased
+from sqlalchemy import Integer, String, any_, bindparam, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from app.src.entity.models import Book, CatalogBook
+from app.src.repository.books_count import get_count_strategy
+from app.src.repository.books_filter import (
+    DynamicFilterFactory,
+    filter_params_values,
+    filter_shape,
+    statement_cache,
 )
-from app.src.repository.books_filter import DynamicFilterFactory
+from app.src.repository.catalog import CATALOG_COLUMNS, catalog_source_query
+from app.src.repository.pagination import encode_cursor, decode_cursor
+from app.src.repository.review import get_review_previews
 from app.src.schemas.books import BookResponse
 
+# Колонки catalog_books з мітками-аліасами полів BookResponse у тому ж порядку.
+# Дані з БД довірені, тож відповідь збирається без створення моделей Pydantic
+BOOK_RESPONSE_COLUMNS = {
+    field.alias or name: getattr(CatalogBook, name).label(field.alias or name)
+    for name, field in BookResponse.model_fields.items()
+    if name not in ("reviews", "total_sales", "orders")
+}
+# Поля поза catalog_books: відгуки — окремим запитом, решта поки завжди null
+EXTRA_FIELDS = ("reviews", "totalSales", "orders")
 
-#
-async def get_all_books(
-    session: AsyncSession, limit, offset, filter_params
-) -> Tuple[int, List[BookResponse]]:
-    reviews_subquery = (
-        select(
-            Review.book_id,
-            func.jsonb_agg(
-                func.distinct(
-                    func.jsonb_build_object(
-                        "id",
-                        Review.id,
-                        "book_id",
-                        Review.book_id,
-                        "review_text",
-                        Review.review_text,
-                        "rate",
-                        Review.rate,
-                        "review_date",
-                        Review.review_date,
-                        "user_id",
-                        Review.user_id,
-                        "review_name",
-                        User.first_name,
-                        "avatar",
-                        User.avatar,
-                        "created_at",
-                        Review.created_at,
-                        "updated_at",
-                        Review.updated_at,
-                    )
-                )
-            ).label("reviews"),
-            func.coalesce(func.avg(func.coalesce(Review.rate, 0)), 0).label("rate"),
-        )
-        .join(User, User.id == Review.user_id)
-        .group_by(Review.book_id)
-        .subquery()
-    )
+BOOK_VIEWS = {
+    "full": (*BOOK_RESPONSE_COLUMNS, *EXTRA_FIELDS),
+    # Картка для сітки каталогу
+    "card": (
+        "bookId",
+        "title",
+        "author",
+        "images",
+        "price",
+        "actualPrice",
+        "rate",
+        "isAvailable",
+    ),
+}
+# У картці потрібна лише обкладинка — зріз масиву робить Postgres
+CARD_COLUMNS = {"images": CatalogBook.images[1:1].label("images")}
 
-    categories_subquery = (
-        select(
-            Category.book_id,
-            func.array_agg(func.distinct(Category.category)).label("categories"),
-        )
-        .group_by(Category.book_id)
-        .subquery()
-    )
 
-    target_ages_subquery = (
-        select(
-            TargetAge.book_id,
-            func.array_agg(func.distinct(TargetAge.target_age)).label("target_ages"),
+def resolve_book_fields(view: str = "full", fields: Optional[str] = None) -> tuple:
+    """
+    Набір полів відповіді: явний fields= (camelCase через кому) або іменований view.
+    bookId потрібен завжди — він є ключем курсора.
+    """
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in BOOK_VIEWS["full"]]
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+    elif view in BOOK_VIEWS:
+        selected = BOOK_VIEWS[view]
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown view: {view}. Use one of: {', '.join(BOOK_VIEWS)}",
         )
-        .group_by(TargetAge.book_id)
-        .subquery()
-    )
+    return tuple(dict.fromkeys(("bookId", *selected)))
 
-    book_type_subquery = (
-        select(
-            BookType.book_id,
-            func.array_agg(func.distinct(BookType.book_type)).label("book_type"),
-        )
-        .group_by(BookType.book_id)
-        .subquery()
-    )
 
-    row_number_subquery = (
-        select(
-            Book.id,
-            over(func.row_number(), order_by=Book.created_at).label("row_num"),
-        )
-        .group_by(Book.id)
-        .subquery()
-    )
+# Назва колонки catalog_books -> ключ відповіді
+_FIELD_ALIASES = {
+    name: field.alias or name for name, field in BookResponse.model_fields.items()
+}
 
-    # 1. Створюємо базовий запит для книг без ліміту та офсету
-    base_query = select(Book.id).group_by(Book.id)
+BOOK_INCLUDES = ("reviews", "similar")
+BOOK_DETAIL_REVIEWS = 10
+SIMILAR_BOOKS_LIMIT = 8
 
-    actual_price_subquery = select(
-        Book.id,
-        cast(func.round(Book.price * (1.0 - Book.discount), 0), Numeric).label(
-            "actual_price"
-        ),
-    ).subquery()
 
-    # 2. Додаємо фільтрацію до `base_query`
-    dynamic_factory = DynamicFilterFactory(
-        filter_params, reviews_subquery, actual_price_subquery
-    )
-    filters = dynamic_factory.create_filters()
+def _book_columns(book_fields: tuple, view: str) -> list:
+    overrides = CARD_COLUMNS if view == "card" else {}
+    return [
+        overrides.get(field, BOOK_RESPONSE_COLUMNS[field])
+        for field in book_fields
+        if field in BOOK_RESPONSE_COLUMNS
+    ]
 
+
+def _build_listing_statements(
+    filters, sort_filter, use_cursor: bool, view: str, book_fields: tuple
+):
+    # 1. Базовий запит для підрахунку: id книг catalog_books, що проходять фільтри.
+    # Фільтри — лише умови й EXISTS без join-ів, тож GROUP BY не потрібен
+    base_query = select(CatalogBook.book_id)
     for filter_ in filters:
         base_query = filter_.apply(base_query)
 
-    # 3. Підраховуємо `total_books` після фільтрації (ОКРЕМО від `LIMIT` та `OFFSET`)
-    total_books_subquery = (
-        select(func.count()).select_from(base_query.subquery()).scalar_subquery()
+    # 2. Сторінка — один select з catalog_books: фільтри, ключ сортування, курсор і
+    # поля відповіді беруться з того самого рядка, тож не можуть розійтися між собою.
+    # Колонки одразу підписані ключами відповіді (camelCase), тож рядок = готовий dict
+    query = select(
+        sort_filter.sort_column.label("sort_key"),
+        # Лише запитані поля: без description та інших важких колонок для карток
+        *_book_columns(book_fields, view),
+    ).limit(bindparam("page_limit", type_=Integer))
+    for filter_ in filters:
+        query = filter_.apply(query)
+    if sort_filter.needs_book:
+        query = query.join(Book, Book.id == CatalogBook.book_id)
+
+    # 3. Курсорний режим: замість OFFSET фільтруємо за ключем сортування останнього рядка
+    if use_cursor:
+        query = sort_filter.apply_cursor(query)
+    else:
+        query = query.offset(bindparam("page_offset", type_=Integer))
+
+    return base_query, sort_filter.apply(query)
+
+
+async def get_all_books(
+    session: AsyncSession,
+    limit,
+    offset,
+    filter_params,
+    cursor: Optional[str] = None,
+    count_mode: str = "exact",
+    reviews_preview: int = 0,
+    view: str = "full",
+    book_fields: Optional[tuple] = None,
+) -> Tuple[Optional[int], List[dict], Optional[str]]:
+    if book_fields is None:
+        book_fields = resolve_book_fields(view)
+
+    dynamic_factory = DynamicFilterFactory(filter_params)
+    filters = dynamic_factory.create_filters_by_param()
+    sort_filter = dynamic_factory.create_sort_filter()
+
+    # Запити однакової форми (набір фільтрів, сортування, режим пагінації, поля)
+    # будуються один раз; значення фільтрів ідуть параметрами, тож SQL-рядок стабільний
+    # і повторно використовуються і кеш компіляції SQLAlchemy, і prepared statements asyncpg
+    shape = (
+        "listing",
+        filter_shape(filters),
+        sort_filter.cursor_scope,
+        bool(cursor),
+        view,
+        book_fields,
     )
+    statements = statement_cache.get(shape)
+    if statements is None:
+        statements = _build_listing_statements(
+            filters.values(), sort_filter, bool(cursor), view, book_fields
+        )
+        statement_cache.set(shape, statements)
+    base_query, query = statements
 
-    filtered_books_subquery = base_query.subquery()
+    params = filter_params_values(filters.values())
+    params.update(sort_filter.params())
 
-    query = (
-        select(
-            total_books_subquery.label("total_books"),
-            Book.id,
-            Book.author,
-            Book.title,
-            BookInfo.original_title,
-            Book.genre,
-            categories_subquery.c.categories,
-            target_ages_subquery.c.target_ages,
-            BookInfo.series,
-            BookInfo.publisher,
-            BookInfo.publication_year,
-            book_type_subquery.c.book_type,
-            BookInfo.page_count,
-            BookInfo.paper_type,
-            Book.language,
-            Book.original_language,
-            BookInfo.translator,
-            BookInfo.cover_type,
-            BookInfo.weight,
-            BookInfo.dimensions,
-            BookInfo.isbn,
-            BookInfo.article_number,
-            Book.price,
-            actual_price_subquery.c.actual_price,
-            Book.discount,
-            Book.stock_quantity,
-            BookInfo.description,
-            func.array_agg(Image.image_url).label("images"),
-            reviews_subquery.c.reviews,
-            Book.is_bestseller,
-            Book.is_publish,
-            Book.is_gifted,
-            Book.is_available,
-            Book.created_at,
-            Book.updated_at,
-            func.coalesce(reviews_subquery.c.rate, 0).label("rate"),
+    # Підраховуємо `total_books` окремим запитом згідно зі стратегією підрахунку
+    total_books = await get_count_strategy(count_mode).count(
+        session, base_query, filter_params, params
+    )
+
+    # Беремо на один рядок більше, щоб знати, чи є наступна сторінка
+    params["page_limit"] = limit + 1
+    if cursor:
+        sort_value, last_book_id = decode_cursor(cursor, sort_filter.cursor_scope)
+        params.update(sort_filter.cursor_params(sort_value, last_book_id))
+    else:
+        params["page_offset"] = offset
+
+    books_result = await session.execute(query, params)
+    books = [dict(row) for row in books_result.mappings().all()]
+
+    next_cursor = None
+    if len(books) > limit:
+        books = books[:limit]
+        next_cursor = encode_cursor(
+            sort_filter.cursor_scope, [books[-1]["sort_key"], books[-1]["bookId"]]
         )
-        .join(filtered_books_subquery, filtered_books_subquery.c.id == Book.id)
-        .join(row_number_subquery, row_number_subquery.c.id == Book.id)
-        .join(actual_price_subquery, actual_price_subquery.c.id == Book.id)
-        .outerjoin(BookInfo, BookInfo.book_id == Book.id)
-        .outerjoin(reviews_subquery, reviews_subquery.c.book_id == Book.id)
-        .outerjoin(categories_subquery, categories_subquery.c.book_id == Book.id)
-        .outerjoin(target_ages_subquery, target_ages_subquery.c.book_id == Book.id)
-        .outerjoin(book_type_subquery, book_type_subquery.c.book_id == Book.id)
-        .outerjoin(Image, Image.book_id == Book.id)
-        .group_by(
-            Book.id,
-            BookInfo.id,
-            BookInfo.original_title,
-            actual_price_subquery.c.actual_price,
-            BookInfo.series,
-            BookInfo.publisher,
-            BookInfo.publication_year,
-            BookInfo.page_count,
-            BookInfo.paper_type,
-            BookInfo.translator,
-            BookInfo.cover_type,
-            BookInfo.weight,
-            BookInfo.dimensions,
-            BookInfo.isbn,
-            BookInfo.article_number,
-            BookInfo.description,
-            reviews_subquery.c.reviews,
-            reviews_subquery.c.rate,
-            categories_subquery.c.categories,
-            target_ages_subquery.c.target_ages,
-            book_type_subquery.c.book_type,
+
+    for book in books:
+        del book["sort_key"]
+    await _add_extra_fields(session, books, book_fields, reviews_preview)
+
+    return total_books, books, next_cursor
+
+
+async def _add_extra_fields(
+    session: AsyncSession, books: List[dict], book_fields: tuple, reviews_preview: int
+) -> None:
+    # Відгуки не агрегуються у запит каталогу: беремо лише N останніх для книг сторінки
+    # (запит пропускається, якщо поле reviews не запитане)
+    previews = {}
+    if reviews_preview and books and "reviews" in book_fields:
+        previews = await get_review_previews(
+            session, [book["bookId"] for book in books], reviews_preview
+        )
+
+    for book in books:
+        if "reviews" in book_fields:
+            book["reviews"] = previews.get(book["bookId"], [])
+        # Якщо потрібно, totalSales та orders можна отримати окремим запитом
+        if "totalSales" in book_fields:
+            book["totalSales"] = None
+        if "orders" in book_fields:
+            book["orders"] = None
+
+
+async def get_books_batch(
+    session: AsyncSession,
+    ids: List[uuid.UUID],
+    isbns: List[str],
+    article_numbers: List[str],
+    book_fields: tuple,
+    view: str = "full",
+) -> Tuple[List[dict], dict]:
+    """
+    Книги за списками id, ISBN та артикулів одним запитом (= ANY(:array) по кожному
+    ключу). Порядок відповіді — порядок ключів у запиті; відсутні ключі повертаються окремо.
+    """
+    query = select(
+        *_book_columns(book_fields, view),
+        CatalogBook.isbn.label("_isbn"),
+        CatalogBook.article_number.label("_article_number"),
+    ).where(
+        or_(
+            # Кожен список — один параметр-масив, тож план не залежить від кількості ключів
+            CatalogBook.book_id == any_(literal(ids, ARRAY(UUID(as_uuid=True)))),
+            CatalogBook.isbn == any_(literal(isbns, ARRAY(String))),
+            CatalogBook.article_number == any_(literal(article_numbers, ARRAY(String))),
         )
-        .limit(limit)
-        .offset(offset)
     )
+    result = await session.execute(query)
+    rows = [dict(row) for row in result.mappings().all()]
 
-    sort_filter = dynamic_factory.create_sort_filter()
-    query = sort_filter.apply(query)
+    by_key = {"ids": {}, "isbns": {}, "articleNumbers": {}}
+    for row in rows:
+        by_key["ids"][row["bookId"]] = row
+        by_key["isbns"][row.pop("_isbn")] = row
+        by_key["articleNumbers"][row.pop("_article_number")] = row
 
-    books_result = await session.execute(query)
-    books = [dict(book) for book in books_result.mappings().all()]
+    books, seen = [], set()
+    missing = {"ids": [], "isbns": [], "articleNumbers": []}
+    for key_name, keys in (
+        ("ids", ids),
+        ("isbns", isbns),
+        ("articleNumbers", article_numbers),
+    ):
+        for key in keys:
+            book = by_key[key_name].get(key)
+            if book is None:
+                missing[key_name].append(key)
+            elif book["bookId"] not in seen:
+                # Книга, запитана кількома ключами, повертається один раз — на першій позиції
+                seen.add(book["bookId"])
+                books.append(book)
 
-    # Отримуємо загальну кількість книг з першого запису (оскільки воно однакове для всіх)
-    total_books = books[0]["total_books"] if books and "total_books" in books[0] else 0
+    await _add_extra_fields(session, books, book_fields, 0)
+    return books, missing
 
-    categories_mapping = {item.name: item.value for item in enums.CategoriesEnum}
-    target_ages_mapping = {item.name: item.value for item in enums.TargetAgesEnum}
-    book_type_mapping = {item.name: item.value for item in enums.BookTypeEnum}
 
-    for book in books:
-        book["categories"] = [
-            categories_mapping.get(cat, enums.CategoriesEnum.other_category.value)
-            for cat in book["categories"]
-        ]
-        book["target_ages"] = [
-            target_ages_mapping.get(age, enums.TargetAgesEnum.other_target.value)
-            for age in book["target_ages"]
-        ]
-        book["book_type"] = [
-            book_type_mapping.get(bt, enums.BookTypeEnum.paperback.value)
-            for bt in book["book_type"]
-        ]
-
-    book_responses = [
-        BookResponse(
-            book_id=book["id"],
-            title=book["title"],
-            author=book["author"],
-            original_title=book["original_title"],
-            genre=book["genre"],
-            categories=[c for c in book["categories"] if c is not None],
-            target_ages=[t for t in book["target_ages"] if t is not None],
-            series=book["series"],
-            publisher=book["publisher"],
-            publication_year=book["publication_year"],
-            book_type=[b for b in book["book_type"] if b is not None],
-            page_count=book["page_count"],
-            paper_type=book["paper_type"],
-            language=book["language"],
-            original_language=book["original_language"],
-            translator=book["translator"],
-            cover_type=book["cover_type"],
-            weight=book["weight"],
-            dimensions=book["dimensions"],
-            isbn=book["isbn"],
-            article_number=book["article_number"],
-            price=book["price"],
-            actual_price=book["actual_price"],
-            discount=book["discount"],
-            stock_quantity=book["stock_quantity"],
-            description=book["description"],
-            images=[i for i in book["images"] if i is not None],
-            reviews=(
-                [r for r in book["reviews"] if r is not None] if book["reviews"] else []
-            ),
-            is_bestseller=book["is_bestseller"],
-            is_publish=book["is_publish"],
-            is_gifted=book["is_gifted"],
-            is_available=book["is_available"],
-            total_sales=None,  # Якщо потрібно, можна отримати окремим запитом
-            orders=None,
-            created_at=book["created_at"],
-            updated_at=book["updated_at"],
-            rate=book["rate"],
+def resolve_book_includes(include: Optional[str]) -> tuple:
+    if not include:
+        return ()
+    selected = {item.strip() for item in include.split(",") if item.strip()}
+    unknown = selected - set(BOOK_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}"
         )
-        for book in books
-    ]
+    return tuple(sorted(selected))
+
+
+async def get_book_by_id(
+    session: AsyncSession, book_id: uuid.UUID, include: tuple = ()
+) -> Optional[dict]:
+    # Запит за PK: агрегує зображення, категорії й рейтинг лише цієї книги.
+    # Читаємо з джерела, а не з catalog_books, щоб не чекати на CatalogRefresher.
+    # GET /books/{id} виконує це на primary; /books/{id}/page — на репліці,
+    # тож там дані можуть відставати від запису на db_replica_max_lag
+    result = await session.execute(catalog_source_query([book_id]))
+    row = result.first()
+    if row is None:
+        return None
+    book = {
+        _FIELD_ALIASES[column]: value
+        for column, value in zip(CATALOG_COLUMNS, row)
+        if column in _FIELD_ALIASES
+    }
+
+    book["reviews"] = []
+    if "reviews" in include:
+        previews = await get_review_previews(session, [book_id], BOOK_DETAIL_REVIEWS)
+        book["reviews"] = previews.get(book_id, [])
+    book["totalSales"] = None
+    book["orders"] = None
 
-    return total_books, book_responses
+    if "similar" in include:
+        book["similar"] = await get_similar_books(session, book_id)
+    return book
+
+
+async def get_similar_books(
+    session: AsyncSession, book_id: uuid.UUID, limit: int = SIMILAR_BOOKS_LIMIT
+) -> List[dict]:
+    # Картки книг того ж жанру або з тими ж категоріями; спершу той самий жанр, далі за рейтингом.
+    # Жанр і категорії беремо підзапитом, тож запит не чекає на деталі книги
+    source = aliased(CatalogBook)
+    genre = select(source.genre).where(source.book_id == book_id).scalar_subquery()
+    categories = (
+        select(source.categories).where(source.book_id == book_id).scalar_subquery()
+    )
+    same_genre = CatalogBook.genre == genre
+    query = (
+        select(*_book_columns(BOOK_VIEWS["card"], "card"))
+        .where(CatalogBook.book_id != book_id)
+        .where(or_(same_genre, CatalogBook.categories.overlap(categories)))
+        .order_by(same_genre.desc(), CatalogBook.rate.desc(), CatalogBook.book_id)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return [dict(row) for row in result.mappings().all()]
@@ -0,0 +1,111 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from app.src.config.config import settings
+from app.src.repository.books_filter import normalize_filter_params
+from app.src.services.cache import TTLCache
+from app.src.services.catalog_events import catalog_events, CATALOG_TAG
+
+
+class Explain(Executable, ClauseElement):
+    # Ключ кешу — вкладений запит, тож EXPLAIN теж потрапляє в кеш компіляції
+    inherit_cache = False
+    _traverse_internals = [("statement", InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class CountStrategy(ABC):
+
+    @abstractmethod
+    async def count(
+        self, session: AsyncSession, base_query, filter_params: dict, params: dict
+    ) -> Optional[int]:
+        pass
+
+
+class ExactCountStrategy(CountStrategy):
+    async def count(self, session, base_query, filter_params, params):
+        query = select(func.count()).select_from(base_query.subquery())
+        result = await session.execute(query, params)
+        return result.scalar_one()
+
+
+class CachedCountStrategy(CountStrategy):
+    def __init__(self, cache: TTLCache, exact: CountStrategy):
+        self.cache = cache
+        self.exact = exact
+
+    async def count(self, session, base_query, filter_params, params):
+        key = normalize_filter_params(filter_params)
+        total = self.cache.get(key)
+        if total is None:
+            total = await self.exact.count(session, base_query, filter_params, params)
+            self.cache.set(key, total)
+        return total
+
+
+class EstimateCountStrategy(CountStrategy):
+    def __init__(self, exact: CountStrategy, threshold: int):
+        self.exact = exact
+        self.threshold = threshold
+
+    async def count(self, session, base_query, filter_params, params):
+        result = await session.execute(Explain(base_query), params)
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        # Для невеликих вибірок оцінка планувальника неточна, а точний count дешевий
+        if estimate < self.threshold:
+            return await self.exact.count(session, base_query, filter_params, params)
+        return estimate
+
+
+class HasNextCountStrategy(CountStrategy):
+    async def count(self, session, base_query, filter_params, params):
+        return None
+
+
+count_cache = TTLCache(ttl=settings.books_count_cache_ttl)
+
+
+@catalog_events.subscribe
+def _invalidate_count_cache(book_ids, tags):
+    # Підрахунки йдуть по catalog_books — скидаємо, коли їх оновив CatalogRefresher
+    if CATALOG_TAG in tags:
+        count_cache.clear()
+
+
+_exact = ExactCountStrategy()
+
+COUNT_STRATEGIES = {
+    "exact": _exact,
+    "cached": CachedCountStrategy(count_cache, _exact),
+    "estimate": EstimateCountStrategy(_exact, settings.books_count_estimate_threshold),
+    "has_next": HasNextCountStrategy(),
+}
+
+
+def get_count_strategy(count_mode: str) -> CountStrategy:
+    strategy = COUNT_STRATEGIES.get(count_mode)
+    if strategy is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid count mode: '{count_mode}'. Use one of: {', '.join(COUNT_STRATEGIES)}",
+        )
+    return strategy
@@ -0,0 +1,163 @@
+from typing import Dict, List
+
+from sqlalchemy import func, select, distinct, tuple_, column, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.config.config import settings
+from app.src.entity.models import CatalogBook
+from app.src.repository.books_filter import (
+    DynamicFilterFactory,
+    Filter,
+    filter_params_values,
+    filter_shape,
+    normalize_filter_params,
+    statement_cache,
+)
+from app.src.services.cache import TTLCache
+from app.src.services.catalog_events import catalog_events, CATALOG_TAG
+
+
+def _unnest(array_column, name):
+    # LEFT JOIN LATERAL unnest(catalog_books.<array>) AS <name>(value) ON true
+    return (
+        func.unnest(array_column)
+        .table_valued(column("value", array_column.type.item_type))
+        .render_derived(name=name)
+        .lateral()
+    )
+
+
+# Фасети рахуються з catalog_books — тієї самої таблиці, з якої фільтрується й
+# читається лістинг, тож кількості збігаються з totalBooks сторінки
+_categories = _unnest(CatalogBook.categories, "category_facet")
+_target_ages = _unnest(CatalogBook.target_ages, "target_age_facet")
+_book_types = _unnest(CatalogBook.book_type, "book_type_facet")
+
+FACET_COLUMNS = {
+    "genre": CatalogBook.genre,
+    "categories": _categories.c.value,
+    "target_ages": _target_ages.c.value,
+    "language": CatalogBook.language,
+    "cover_type": CatalogBook.cover_type,
+    "book_type": _book_types.c.value,
+}
+
+# Параметри фільтрів, які не застосовуються при підрахунку відповідного фасета
+FACET_PARAMS = {
+    **{facet: (facet,) for facet in FACET_COLUMNS},
+    "price": ("actual_price_min", "actual_price_max"),
+}
+
+facets_cache = TTLCache(ttl=settings.books_facets_cache_ttl)
+
+
+@catalog_events.subscribe
+def _invalidate_facets_cache(book_ids, tags):
+    if CATALOG_TAG in tags:
+        facets_cache.clear()
+
+
+def _filtered_ids(filters: List[Filter]):
+    query = select(CatalogBook.book_id.label("id"))
+    for filter_ in filters:
+        query = filter_.apply(query)
+    return query
+
+
+def _build_facets_query(filters: Dict[str, Filter]):
+    excluded = {param for params in FACET_PARAMS.values() for param in params}
+    common_ids = _filtered_ids(
+        [f for param, f in filters.items() if param not in excluded]
+    ).cte("facet_common")
+    all_ids = _filtered_ids(list(filters.values())).cte("facet_all")
+
+    # Для кожного фасета — множина книг з усіма фільтрами, крім його власного.
+    # Якщо власного фільтра немає, використовується спільна CTE facet_all.
+    facet_ids = {}
+    for facet, params in FACET_PARAMS.items():
+        if any(param in filters for param in params):
+            facet_ids[facet] = _filtered_ids(
+                [f for param, f in filters.items() if param not in params]
+            ).cte(f"facet_{facet}")
+        else:
+            facet_ids[facet] = all_ids
+
+    def matches(ids_cte):
+        return CatalogBook.book_id.in_(select(ids_cte.c.id))
+
+    book_count = func.count(distinct(CatalogBook.book_id))
+    price_condition = matches(facet_ids["price"])
+    query = (
+        select(
+            *[column.label(facet) for facet, column in FACET_COLUMNS.items()],
+            *[
+                func.grouping(column).label(f"{facet}_grouping")
+                for facet, column in FACET_COLUMNS.items()
+            ],
+            *[
+                book_count.filter(matches(facet_ids[facet])).label(f"{facet}_count")
+                for facet in FACET_COLUMNS
+            ],
+            book_count.filter(matches(all_ids)).label("total_books"),
+            func.min(CatalogBook.actual_price)
+            .filter(price_condition)
+            .label("price_min"),
+            func.max(CatalogBook.actual_price)
+            .filter(price_condition)
+            .label("price_max"),
+        )
+        .select_from(CatalogBook)
+        .outerjoin(_categories, true())
+        .outerjoin(_target_ages, true())
+        .outerjoin(_book_types, true())
+        .where(matches(common_ids))
+        .group_by(func.grouping_sets(*FACET_COLUMNS.values(), tuple_()))
+    )
+    return query
+
+
+async def get_facets(
+    session: AsyncSession, filter_params: dict, use_cache: bool = True
+) -> Dict:
+    cache_key = normalize_filter_params(filter_params)
+    cached = facets_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        return cached
+
+    filters = {
+        param: filter_
+        for param, filter_ in DynamicFilterFactory(filter_params)
+        .create_filters_by_param()
+        .items()
+        if filter_.shape is not None
+    }
+    # Запит фасетів залежить лише від того, які фільтри діють; значення — параметри
+    shape = ("facets", filter_shape(filters))
+    query = statement_cache.get(shape)
+    if query is None:
+        query = _build_facets_query(filters)
+        statement_cache.set(shape, query)
+
+    result = await session.execute(query, filter_params_values(filters.values()))
+
+    facets = {
+        **{facet: {} for facet in FACET_COLUMNS},
+        "total_books": 0,
+        "price_min": None,
+        "price_max": None,
+    }
+    for row in result.mappings().all():
+        grouped = [f for f in FACET_COLUMNS if row[f"{f}_grouping"] == 0]
+        if not grouped:
+            facets["total_books"] = row["total_books"]
+            facets["price_min"] = row["price_min"]
+            facets["price_max"] = row["price_max"]
+            continue
+        facet = grouped[0]
+        value, count = row[facet], row[f"{facet}_count"]
+        if value is not None and count:
+            facets[facet][value.value] = count
+
+    if use_cache:
+        facets_cache.set(cache_key, facets)
+    return facets
@@ -2,27 +2,62 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import func, desc, asc, cast, Numeric
+from sqlalchemy import func, desc, asc, cast, Numeric, tuple_, bindparam, exists
 from sqlalchemy.orm import Query
 
+from app.src.config.config import settings
 from app.src.entity import enums
-from app.src.entity.models import Book, BookInfo, Category, TargetAge, BookType
+from app.src.entity.models import Book, CatalogBook
+from app.src.repository.books_search import (
+    SEARCH_PARAM,
+    search_condition,
+    search_relevance,
+)
+from app.src.services.cache import TTLCache
 from sqlalchemy.sql import and_
 
 
 class Filter(ABC):
+    """
+    Фільтр додає до запиту лише умову з іменованими bindparam, а значення віддає
+    через params(): запит однакової форми будується й компілюється один раз.
+    Умови накладаються на колонки catalog_books — ту саму таблицю, з якої
+    читаються сторінка, сортування й курсор.
+    """
 
     @abstractmethod
     def apply(self, query: Query):
         pass
 
+    def params(self) -> dict:
+        return {}
+
+    @property
+    def shape(self):
+        # Форма умови для ключа кешу запитів; None — фільтр нічого не додає
+        return type(self).__name__
+
+
+def match_condition(column, param: str, match: str):
+    """
+    Умова для списку значень через кому: any — хоча б одне (&&),
+    all — усі одразу (@>). Обидва оператори обслуговує GIN-індекс масиву.
+    """
+    values = bindparam(param, type_=column.type)
+    if match == "all":
+        return column.contains(values)
+    return column.overlap(values)
+
 
 class AuthorFilter(Filter):
     def __init__(self, author):
         self.author = author
 
     def apply(self, query):
-        return query.filter(Book.author.ilike(f"%{self.author}%"))
+        return query.filter(CatalogBook.author.ilike(bindparam("author")))
+
+    def params(self):
+        return {"author": f"%{self.author}%"}
 
 
 class TitleFilter(Filter):
@@ -30,7 +65,32 @@ class TitleFilter(Filter):
         self.title = title
 
     def apply(self, query):
-        return query.filter(Book.title.ilike(f"%{self.title}%"))
+        return query.filter(CatalogBook.title.ilike(bindparam("title")))
+
+    def params(self):
+        return {"title": f"%{self.title}%"}
+
+
+class SearchFilter(Filter):
+    def __init__(self, search):
+        self.search = search.strip()
+
+    def apply(self, query):
+        if self.search:
+            # search_vector і trigram-індекси є лише в books — семі-join за PK
+            return query.filter(
+                exists()
+                .where(Book.id == CatalogBook.book_id, search_condition(SEARCH_PARAM))
+                .correlate(CatalogBook)
+            )
+        return query
+
+    def params(self):
+        return {SEARCH_PARAM.key: self.search} if self.search else {}
+
+    @property
+    def shape(self):
+        return super().shape if self.search else None
 
 
 class GenreFilter(Filter):
@@ -42,12 +102,20 @@ class GenreFilter(Filter):
 
     def apply(self, query):
         if self.genre:
-            return query.filter(Book.genre == self.genre)
+            return query.filter(CatalogBook.genre == bindparam("genre"))
         return query
 
+    def params(self):
+        return {"genre": self.genre} if self.genre else {}
+
+    @property
+    def shape(self):
+        return super().shape if self.genre else None
+
 
 class CategoriesFilter(Filter):
-    def __init__(self, categories_: Optional[str]):
+    def __init__(self, categories_: Optional[str], match: Optional[str] = None):
+        self.match = match or "any"
         self.categories = []
         if categories_:
             for category in categories_.split(","):
@@ -58,12 +126,23 @@ class CategoriesFilter(Filter):
 
     def apply(self, query):
         if self.categories:
-            return query.join(Category).filter(Category.category.in_(self.categories))
+            return query.filter(
+                match_condition(CatalogBook.categories, "categories", self.match)
+            )
         return query
 
+    def params(self):
+        return {"categories": self.categories} if self.categories else {}
+
+    @property
+    def shape(self):
+        # any/all дають різний оператор, тож це різні форми запиту
+        return f"{super().shape}:{self.match}" if self.categories else None
+
 
 class TargetAgesFilter(Filter):
-    def __init__(self, target_ages: Optional[str]):
+    def __init__(self, target_ages: Optional[str], match: Optional[str] = None):
+        self.match = match or "any"
         self.target_ages = []
         if target_ages:
             for target_age in target_ages.split(","):
@@ -74,15 +153,24 @@ class TargetAgesFilter(Filter):
 
     def apply(self, query):
         if self.target_ages:
-            return query.join(TargetAge).filter(
-                TargetAge.target_age.in_(self.target_ages)
+            return query.filter(
+                match_condition(CatalogBook.target_ages, "target_ages", self.match)
             )
         return query
 
+    def params(self):
+        return {"target_ages": self.target_ages} if self.target_ages else {}
+
+    @property
+    def shape(self):
+        # any/all дають різний оператор, тож це різні форми запиту
+        return f"{super().shape}:{self.match}" if self.target_ages else None
+
 
 #
 class BookTypeFilter(Filter):
-    def __init__(self, book_types: Optional[str]):
+    def __init__(self, book_types: Optional[str], match: Optional[str] = None):
+        self.match = match or "any"
         self.book_types = []
         if book_types:
             for book_type in book_types.split(","):
@@ -93,9 +181,19 @@ class BookTypeFilter(Filter):
 
     def apply(self, query):
         if self.book_types:
-            return query.join(BookType).filter(BookType.book_type.in_(self.book_types))
+            return query.filter(
+                match_condition(CatalogBook.book_type, "book_types", self.match)
+            )
         return query
 
+    def params(self):
+        return {"book_types": self.book_types} if self.book_types else {}
+
+    @property
+    def shape(self):
+        # any/all дають різний оператор, тож це різні форми запиту
+        return f"{super().shape}:{self.match}" if self.book_types else None
+
 
 class PaperTypeFilter(Filter):
     def __init__(self, paper_type):
@@ -106,9 +204,16 @@ class PaperTypeFilter(Filter):
 
     def apply(self, query):
         if self.paper_type:
-            return query.join(BookInfo).filter(BookInfo.paper_type == self.paper_type)
+            return query.filter(CatalogBook.paper_type == bindparam("paper_type"))
         return query
 
+    def params(self):
+        return {"paper_type": self.paper_type} if self.paper_type else {}
+
+    @property
+    def shape(self):
+        return super().shape if self.paper_type else None
+
 
 class LanguageFilter(Filter):
     def __init__(self, language):
@@ -119,9 +224,16 @@ class LanguageFilter(Filter):
 
     def apply(self, query):
         if self.language:
-            return query.filter(Book.language == self.language)
+            return query.filter(CatalogBook.language == bindparam("language"))
         return query
 
+    def params(self):
+        return {"language": self.language} if self.language else {}
+
+    @property
+    def shape(self):
+        return super().shape if self.language else None
+
 
 class CoverTypeFilter(Filter):
     def __init__(self, cover_type):
@@ -132,9 +244,16 @@ class CoverTypeFilter(Filter):
 
     def apply(self, query):
         if self.cover_type:
-            return query.join(BookInfo).filter(BookInfo.cover_type == self.cover_type)
+            return query.filter(CatalogBook.cover_type == bindparam("cover_type"))
         return query
 
+    def params(self):
+        return {"cover_type": self.cover_type} if self.cover_type else {}
+
+    @property
+    def shape(self):
+        return super().shape if self.cover_type else None
+
 
 class DiscountRangeFilter(Filter):
     def __init__(self, discount_min, discount_max):
@@ -143,25 +262,32 @@ class DiscountRangeFilter(Filter):
 
     def apply(self, query):
         return query.filter(
-            and_(Book.discount >= self.discount_min, Book.discount <= self.discount_max)
+            and_(
+                CatalogBook.discount >= bindparam("discount_min"),
+                CatalogBook.discount <= bindparam("discount_max"),
+            )
         )
 
+    def params(self):
+        return {"discount_min": self.discount_min, "discount_max": self.discount_max}
+
 
 class PriceRangeFilter(Filter):
-    def __init__(self, price_min, price_max, actual_price_subquery):
+    def __init__(self, price_min, price_max):
         self.price_min = price_min
         self.price_max = price_max
-        self.actual_price_subquery = actual_price_subquery
 
     def apply(self, query):
-        actual_price = self.actual_price_subquery.c.actual_price
         return query.filter(
             and_(
-                actual_price >= self.price_min,
-                actual_price <= self.price_max,
+                CatalogBook.actual_price >= bindparam("price_min"),
+                CatalogBook.actual_price <= bindparam("price_max"),
             )
         )
 
+    def params(self):
+        return {"price_min": self.price_min, "price_max": self.price_max}
+
 
 class CreatedAtRangeFilter(Filter):
     def __init__(self, created_at_after, created_at_before):
@@ -171,42 +297,77 @@ class CreatedAtRangeFilter(Filter):
     def apply(self, query):
         return query.filter(
             and_(
-                Book.created_at >= self.created_at_after,
-                Book.created_at <= self.created_at_before,
+                CatalogBook.created_at >= bindparam("created_at_after"),
+                CatalogBook.created_at <= bindparam("created_at_before"),
             )
         )
 
+    def params(self):
+        return {
+            "created_at_after": self.created_at_after,
+            "created_at_before": self.created_at_before,
+        }
+
 
 class SortFilter(Filter):
-    def __init__(self, sort_by, sort_order, reviews_subquery, actual_price_subquery):
+    def __init__(self, sort_by, sort_order, search=None):
         self.sort_by = sort_by
         self.sort_order = sort_order.lower()
-        self.review_subquery = reviews_subquery
-        self.actual_price_subquery = actual_price_subquery
 
-    def apply(self, query):
+        # Сортування застосовується до сторінки з catalog_books (див. get_all_books)
         sort_mapping = {
-            "actual_price": self.actual_price_subquery.c.actual_price,
-            "rate": func.coalesce(self.review_subquery.c.rate, 0),
-            "price": Book.price,
-            "discount": Book.discount,
-            "created_at": Book.created_at,
-            "title": Book.title,
-            "author": Book.author,
-            "publication_year": BookInfo.publication_year,
+            "actual_price": CatalogBook.actual_price,
+            "rate": CatalogBook.rate,
+            "price": CatalogBook.price,
+            "discount": CatalogBook.discount,
+            "created_at": CatalogBook.created_at,
+            "title": CatalogBook.title,
+            "author": CatalogBook.author,
+            # NULL у ключі сортування ламає порівняння кортежів у курсорній пагінації
+            "publication_year": func.coalesce(CatalogBook.publication_year, 0),
         }
+        self.search = search.strip() if search else ""
+        if self.search:
+            sort_mapping["relevance"] = search_relevance(SEARCH_PARAM)
+        if self.sort_by not in sort_mapping:
+            self.sort_by = "actual_price"
+        if self.sort_by == "relevance":
+            # Найрелевантніші книги завжди першими
+            self.sort_order = "desc"
+        self.sort_column = sort_mapping[self.sort_by]
+
+    @property
+    def cursor_scope(self) -> str:
+        return f"{self.sort_by}:{self.sort_order}"
+
+    @property
+    def needs_book(self) -> bool:
+        # Релевантність рахується за books.search_vector, тож потрібен join з books
+        return self.sort_by == "relevance"
 
-        sort_column = sort_mapping.get(
-            self.sort_by, self.actual_price_subquery.c.actual_price
-        )
-        if self.sort_by == "actual_price":
-            sort_column = self.actual_price_subquery.c.actual_price
-
-        sort_order = (
-            desc(sort_column) if self.sort_order == "desc" else asc(sort_column)
+    def apply(self, query):
+        # book_id як tie-breaker робить порядок детермінованим для курсора
+        if self.sort_order == "desc":
+            return query.order_by(desc(self.sort_column), desc(CatalogBook.book_id))
+        return query.order_by(asc(self.sort_column), asc(CatalogBook.book_id))
+
+    def params(self):
+        return {SEARCH_PARAM.key: self.search} if self.needs_book else {}
+
+    def apply_cursor(self, query):
+        # Значення курсора передаються через cursor_params під час виконання
+        key = tuple_(self.sort_column, CatalogBook.book_id)
+        value = tuple_(
+            bindparam("cursor_sort_key", type_=self.sort_column.type),
+            bindparam("cursor_book_id", type_=CatalogBook.book_id.type),
         )
+        if self.sort_order == "desc":
+            return query.filter(key < value)
+        return query.filter(key > value)
 
-        return query.order_by(sort_order)
+    @staticmethod
+    def cursor_params(sort_value, book_id) -> dict:
+        return {"cursor_sort_key": sort_value, "cursor_book_id": book_id}
 
 
 # -------------------------------------------------------------------------------------------------------------
@@ -236,6 +397,14 @@ class TitleFilterFactory(FilterFactory):
         return TitleFilter(self.title)
 
 
+class SearchFilterFactory(FilterFactory):
+    def __init__(self, search):
+        self.search = search
+
+    def create_filter(self) -> Filter:
+        return SearchFilter(self.search)
+
+
 class GenreFilterFactory(FilterFactory):
     def __init__(self, genre):
         self.genre = genre
@@ -245,28 +414,31 @@ class GenreFilterFactory(FilterFactory):
 
 
 class CategoriesFilterFactory(FilterFactory):
-    def __init__(self, categories):
+    def __init__(self, categories, match=None):
         self.categories = categories
+        self.match = match
 
     def create_filter(self) -> Filter:
-        return CategoriesFilter(self.categories)
+        return CategoriesFilter(self.categories, self.match)
 
 
 #
 class TargetAgesFilterFactory(FilterFactory):
-    def __init__(self, target_ages):
+    def __init__(self, target_ages, match=None):
         self.target_ages = target_ages
+        self.match = match
 
     def create_filter(self) -> Filter:
-        return TargetAgesFilter(self.target_ages)
+        return TargetAgesFilter(self.target_ages, self.match)
 
 
 class BookTypeFilterFactory(FilterFactory):
-    def __init__(self, book_types):
+    def __init__(self, book_types, match=None):
         self.book_types = book_types
+        self.match = match
 
     def create_filter(self) -> Filter:
-        return BookTypeFilter(self.book_types)
+        return BookTypeFilter(self.book_types, self.match)
 
 
 class PaperTypeFilterFactory(FilterFactory):
@@ -303,15 +475,12 @@ class DiscountRangeFilterFactory(FilterFactory):
 
 
 class PriceRangeFilterFactory(FilterFactory):
-    def __init__(self, price_min, price_max, actual_price_subquery):
+    def __init__(self, price_min, price_max):
         self.price_min = price_min
         self.price_max = price_max
-        self.actual_price_subquery = actual_price_subquery
 
     def create_filter(self) -> Filter:
-        return PriceRangeFilter(
-            self.price_min, self.price_max, self.actual_price_subquery
-        )
+        return PriceRangeFilter(self.price_min, self.price_max)
 
 
 class CreatedAtRangeFilterFactory(FilterFactory):
@@ -332,46 +501,88 @@ class CreatedAtRangeFilterFactory(FilterFactory):
 
 
 class SortFilterFactory(FilterFactory):
-    def __init__(self, sort_by, sort_order, reviews_subquery, actual_price_subquery):
+    def __init__(self, sort_by, sort_order, search=None):
         self.sort_by = sort_by
         self.sort_order = sort_order
-        self.reviews_subquery = reviews_subquery
-        self.actual_price_subquery = actual_price_subquery
+        self.search = search
 
     def create_filter(self) -> Filter:
-        return SortFilter(
-            self.sort_by,
-            self.sort_order,
-            self.reviews_subquery,
-            self.actual_price_subquery,
-        )
+        return SortFilter(self.sort_by, self.sort_order, self.search)
 
 
 # -----------------------------------------------------------------
 # -------------------------DynamicFilterFactory--------------------
+# Готові запити за формою фільтрів. Форма SQL не застаріває, тож TTL немає —
+# лише LRU-обмеження кількості записів
+statement_cache = TTLCache(
+    ttl=float("inf"), max_entries=settings.statement_cache_max_entries
+)
+
+
+def filter_shape(filters: dict) -> tuple:
+    """Ключ кешу запитів: які фільтри діють, без їхніх значень."""
+    return tuple(
+        sorted((param, f.shape) for param, f in filters.items() if f.shape is not None)
+    )
+
+
+def filter_params_values(filters) -> dict:
+    values = {}
+    for filter_ in filters:
+        values.update(filter_.params())
+    return values
+
+
+def normalize_filter_params(filter_params: dict, exclude=("sort_by", "sort_order")):
+    """
+    Стабільний, хешований підпис набору фільтрів: без порожніх значень і
+    параметрів сортування, з нормалізованими списками через кому.
+    """
+    signature = []
+    for param, value in sorted(filter_params.items()):
+        if value is None or param in exclude:
+            continue
+        if isinstance(value, str) and param in (
+            "categories",
+            "target_ages",
+            "book_type",
+        ):
+            value = ",".join(sorted(v.strip() for v in value.split(",") if v.strip()))
+        signature.append((param, str(value)))
+    return tuple(signature)
+
+
 class DynamicFilterFactory:
     def __init__(
         self,
         filter_params,
-        reviews_subquery,
-        actual_price_subquery,
     ):
         self.filter_params = filter_params
-        self.reviews_subquery = reviews_subquery
-        self.actual_price_subquery = actual_price_subquery
         self.sort_by = filter_params.get("sort_by", "created_at")
         self.sort_order = filter_params.get("sort_order", "desc")
 
     def create_filters(self):
-        filters = []
+        return list(self.create_filters_by_param().values())
+
+    def create_filters_by_param(self):
+        # Фільтри з прив'язкою до параметра — потрібно фасетам, щоб виключати власний фільтр
+        filters = {}
 
         filter_mapping = {
             "author": AuthorFilterFactory,
             "title": TitleFilterFactory,
+            "search": SearchFilterFactory,
             "genre": GenreFilterFactory,
-            "categories": CategoriesFilterFactory,
-            "target_ages": TargetAgesFilterFactory,
-            "book_type": BookTypeFilterFactory,
+            # Списки через кому: categoriesMatch/targetAgesMatch/bookTypeMatch = any | all
+            "categories": lambda x: CategoriesFilterFactory(
+                x, self.filter_params.get("categories_match")
+            ),
+            "target_ages": lambda x: TargetAgesFilterFactory(
+                x, self.filter_params.get("target_ages_match")
+            ),
+            "book_type": lambda x: BookTypeFilterFactory(
+                x, self.filter_params.get("book_type_match")
+            ),
             "paper_type": PaperTypeFilterFactory,
             "language": LanguageFilterFactory,
             "cover_type": CoverTypeFilterFactory,
@@ -391,23 +602,21 @@ class DynamicFilterFactory:
                 ),
                 x,
             ),
-            "price_min": lambda x: PriceRangeFilterFactory(
+            "actual_price_min": lambda x: PriceRangeFilterFactory(
                 x,
                 (
-                    self.filter_params.get("price_max")
-                    if self.filter_params.get("price_max") is not None
+                    self.filter_params.get("actual_price_max")
+                    if self.filter_params.get("actual_price_max") is not None
                     else 999_999
                 ),
-                self.actual_price_subquery,
             ),
-            "price_max": lambda x: PriceRangeFilterFactory(
+            "actual_price_max": lambda x: PriceRangeFilterFactory(
                 (
-                    self.filter_params.get("price_min")
-                    if self.filter_params.get("price_min") is not None
+                    self.filter_params.get("actual_price_min")
+                    if self.filter_params.get("actual_price_min") is not None
                     else 0
                 ),
                 x,
-                self.actual_price_subquery,
             ),
             "created_at_after": lambda x: CreatedAtRangeFilterFactory(
                 datetime.strptime(x, "%Y-%m-%d") if isinstance(x, str) else x,
@@ -442,10 +651,10 @@ class DynamicFilterFactory:
                 factory_class = filter_mapping[param]
                 if callable(factory_class):
                     # Для діапазонів (наприклад, discount_min/discount_max)
-                    filters.append(factory_class(value).create_filter())
+                    filters[param] = factory_class(value).create_filter()
                 else:
                     # Для звичайних фільтрів
-                    filters.append(factory_class(value).create_filter())
+                    filters[param] = factory_class(value).create_filter()
 
         return filters
 
@@ -453,6 +662,5 @@ class DynamicFilterFactory:
         return SortFilterFactory(
             self.sort_by,
             self.sort_order,
-            self.reviews_subquery,
-            self.actual_price_subquery,
+            self.filter_params.get("search"),
         ).create_filter()
@@ -0,0 +1,42 @@
+from sqlalchemy import String, bindparam, cast, func, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app.src.entity.models import Book
+
+# Для української у PostgreSQL немає стемера, тому 'simple' (лише нижній регістр)
+# поєднується з 'english' — так само, як будується Book.search_vector
+SEARCH_CONFIGS = ("simple", "english")
+
+# Пошуковий рядок передається одним іменованим параметром: умова й релевантність
+# у різних частинах запиту посилаються на нього, а SQL не залежить від значення
+SEARCH_PARAM = bindparam("search", type_=String)
+
+
+def search_tsquery(term):
+    queries = [
+        func.websearch_to_tsquery(cast(config, REGCONFIG), term)
+        for config in SEARCH_CONFIGS
+    ]
+    tsquery = queries[0]
+    for query in queries[1:]:
+        tsquery = tsquery.op("||")(query)
+    return tsquery
+
+
+def search_condition(term):
+    """
+    Повнотекстовий збіг за search_vector (GIN), а для опечаток — trigram
+    word similarity за title/author (GIN gin_trgm_ops, оператор <%).
+    """
+    return or_(
+        Book.search_vector.op("@@")(search_tsquery(term)),
+        term.op("<%")(Book.title),
+        term.op("<%")(Book.author),
+    )
+
+
+def search_relevance(term):
+    return func.ts_rank_cd(Book.search_vector, search_tsquery(term)) + func.greatest(
+        func.word_similarity(term, Book.title),
+        func.word_similarity(term, Book.author),
+    )
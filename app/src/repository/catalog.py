@@ -0,0 +1,225 @@
+import uuid
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, select, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.entity.models import (
+    Book,
+    BookInfo,
+    Image,
+    BookRatingStats,
+    CatalogBook,
+    CatalogState,
+)
+
+# Єдиний рядок catalog_state, створений міграцією
+CATALOG_STATE_ID = 1
+
+# Колонки catalog_books у тому ж порядку, що й у catalog_source_query()
+CATALOG_COLUMNS = (
+    "book_id",
+    "title",
+    "author",
+    "original_title",
+    "genre",
+    "categories",
+    "target_ages",
+    "book_type",
+    "series",
+    "publisher",
+    "publication_year",
+    "page_count",
+    "paper_type",
+    "language",
+    "original_language",
+    "translator",
+    "cover_type",
+    "weight",
+    "dimensions",
+    "isbn",
+    "article_number",
+    "price",
+    "actual_price",
+    "discount",
+    "stock_quantity",
+    "description",
+    "images",
+    "review_count",
+    "rate",
+    "is_bestseller",
+    "is_publish",
+    "is_gifted",
+    "is_available",
+    "created_at",
+    "updated_at",
+    "stats_updated_at",
+    "info_updated_at",
+    "images_updated_at",
+)
+
+
+def catalog_source_query(book_ids: Optional[Iterable[uuid.UUID]] = None):
+    # Один рядок на книгу, зібраний з books, books_info, images та book_rating_stats
+    # Для книги без зображень array_agg дає {NULL} — прибираємо NULL
+    images = func.array_remove(func.array_agg(Image.image_url), None)
+    query = (
+        select(
+            Book.id,
+            Book.title,
+            Book.author,
+            BookInfo.original_title,
+            Book.genre,
+            Book.category_values,
+            Book.target_age_values,
+            Book.book_type_values,
+            BookInfo.series,
+            BookInfo.publisher,
+            BookInfo.publication_year,
+            BookInfo.page_count,
+            BookInfo.paper_type,
+            Book.language,
+            Book.original_language,
+            BookInfo.translator,
+            BookInfo.cover_type,
+            BookInfo.weight,
+            BookInfo.dimensions,
+            BookInfo.isbn,
+            BookInfo.article_number,
+            Book.price,
+            Book.actual_price,
+            Book.discount,
+            Book.stock_quantity,
+            BookInfo.description,
+            images,
+            func.coalesce(BookRatingStats.review_count, 0),
+            func.coalesce(BookRatingStats.avg_rate, 0),
+            Book.is_bestseller,
+            Book.is_publish,
+            Book.is_gifted,
+            Book.is_available,
+            Book.created_at,
+            Book.updated_at,
+            BookRatingStats.updated_at,
+            BookInfo.updated_at,
+            func.max(Image.updated_at),
+        )
+        .outerjoin(BookInfo, BookInfo.book_id == Book.id)
+        .outerjoin(BookRatingStats, BookRatingStats.book_id == Book.id)
+        .outerjoin(Image, Image.book_id == Book.id)
+        .group_by(Book.id, BookInfo.id, BookRatingStats.book_id)
+    )
+    if book_ids is not None:
+        query = query.where(Book.id.in_(list(book_ids)))
+    return query
+
+
+async def refresh_catalog_books(
+    session: AsyncSession, book_ids: Optional[Iterable[uuid.UUID]] = None
+) -> int:
+    """
+    Upsert рядків catalog_books для вказаних книг (або для всіх, якщо book_ids=None).
+    Видалені книги прибирає ON DELETE CASCADE.
+    """
+    if book_ids is not None:
+        book_ids = list(book_ids)
+        if not book_ids:
+            return 0
+    query = insert(CatalogBook).from_select(
+        list(CATALOG_COLUMNS), catalog_source_query(book_ids)
+    )
+    query = query.on_conflict_do_update(
+        index_elements=[CatalogBook.book_id],
+        set_={
+            **{
+                column: query.excluded[column]
+                for column in CATALOG_COLUMNS
+                if column != "book_id"
+            },
+            "refreshed_at": func.now(),
+        },
+    )
+    result = await session.execute(query)
+    await session.commit()
+    return result.rowcount
+
+
+async def get_stale_catalog_book_ids(
+    session: AsyncSession, limit: int = 1000
+) -> List[uuid.UUID]:
+    # Книги без рядка в каталозі або з іншим updated_at у книзі, статистиці відгуків,
+    # books_info чи зображеннях; видалене зображення змінює їхню кількість
+    images = (
+        select(
+            Image.book_id,
+            func.max(Image.updated_at).label("updated_at"),
+            func.count(Image.id).label("images_count"),
+        )
+        .group_by(Image.book_id)
+        .subquery()
+    )
+    query = (
+        select(Book.id)
+        .outerjoin(CatalogBook, CatalogBook.book_id == Book.id)
+        .outerjoin(BookRatingStats, BookRatingStats.book_id == Book.id)
+        .outerjoin(BookInfo, BookInfo.book_id == Book.id)
+        .outerjoin(images, images.c.book_id == Book.id)
+        .where(
+            or_(
+                CatalogBook.book_id.is_(None),
+                CatalogBook.updated_at != Book.updated_at,
+                CatalogBook.stats_updated_at.is_distinct_from(
+                    BookRatingStats.updated_at
+                ),
+                CatalogBook.info_updated_at.is_distinct_from(BookInfo.updated_at),
+                CatalogBook.images_updated_at.is_distinct_from(images.c.updated_at),
+                func.cardinality(CatalogBook.images)
+                != func.coalesce(images.c.images_count, 0),
+            )
+        )
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_catalog_version(session: AsyncSession) -> int:
+    """
+    Версія каталогу для ETag: лічильник catalog_state, який тригер збільшує при
+    кожній зміні catalog_books (оновлення книги, зображень, відгуків чи видалення)
+    та імені чи аватара автора відгуків.
+    Читання за PK — без сканування каталогу.
+    """
+    result = await session.execute(
+        select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def get_book_version(
+    session: AsyncSession, book_id: uuid.UUID
+) -> Optional[tuple]:
+    # Версія однієї книги для ETag: усі джерела, які get_book_by_id читає наживо
+    # (книга, books_info, зображення, відгуки), та оновлення catalog_books.
+    # Кількість зображень — щоб помітити видалення
+    book_images = select(Image).where(Image.book_id == Book.id)
+    result = await session.execute(
+        select(
+            Book.updated_at,
+            BookRatingStats.updated_at,
+            CatalogBook.refreshed_at,
+            BookInfo.updated_at,
+            book_images.with_only_columns(func.max(Image.updated_at)).scalar_subquery(),
+            book_images.with_only_columns(func.count(Image.id)).scalar_subquery(),
+        )
+        .outerjoin(BookRatingStats, BookRatingStats.book_id == Book.id)
+        .outerjoin(CatalogBook, CatalogBook.book_id == Book.id)
+        .outerjoin(BookInfo, BookInfo.book_id == Book.id)
+        .where(Book.id == book_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    *updated, images_count = row
+    return (*(value.isoformat() if value else None for value in updated), images_count)
@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List
+
+from fastapi import HTTPException
+
+
+# Курсор — це base64 від JSON з ключем сортування та значеннями останнього рядка.
+# Значення зберігаються з тегом типу, щоб при декодуванні відновити datetime/Decimal/UUID.
+def _dump_value(value: Any):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return ["d", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["u", str(value)]
+    if isinstance(value, (Decimal, int, float)):
+        return ["n", str(value)]
+    return ["s", str(value)]
+
+
+def _load_value(value):
+    if value is None:
+        return None
+    tag, raw = value
+    if tag == "d":
+        return datetime.fromisoformat(raw)
+    if tag == "u":
+        return uuid.UUID(raw)
+    if tag == "n":
+        return Decimal(raw)
+    return raw
+
+
+def encode_cursor(scope: str, values: List[Any]) -> str:
+    payload = {"k": scope, "v": [_dump_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_load_value(value) for value in payload["v"]]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("k") != scope:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor does not match the current sort parameters",
+        )
+    return values
@@ -1,15 +1,111 @@
 import uuid
 from datetime import datetime
+from typing import Dict, List, Optional
+from decimal import Decimal, ROUND_HALF_UP
 
 from fastapi import HTTPException
+from pydantic.alias_generators import to_camel
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, func, select, desc
+from sqlalchemy import (
+    and_,
+    any_,
+    func,
+    literal,
+    select,
+    desc,
+    asc,
+    delete,
+    case,
+    tuple_,
+)
 
-from app.src.entity.models import Review, User, Book
+from app.src.entity.models import Review, User, Book, BookRatingStats
+from app.src.repository.pagination import encode_cursor, decode_cursor
 from app.src.schemas.review import ReviewModel
 
+STAR_COLUMNS = ("stars_1", "stars_2", "stars_3", "stars_4", "stars_5")
 
-async def get_review_by_id(session: AsyncSession, review_id: uuid.UUID, user_id: int):
+
+def _star_column(rate) -> str:
+    star = int(Decimal(str(rate)).to_integral_value(rounding=ROUND_HALF_UP))
+    return STAR_COLUMNS[min(max(star, 1), 5) - 1]
+
+
+async def _apply_rating_delta(
+    session: AsyncSession, book_id: uuid.UUID, added_rate=None, removed_rate=None
+) -> None:
+    # Інкрементально оновлюємо book_rating_stats у тій самій транзакції, що й відгук
+    count_delta = 0
+    sum_delta = Decimal(0)
+    star_deltas = {column: 0 for column in STAR_COLUMNS}
+    if added_rate is not None:
+        count_delta += 1
+        sum_delta += Decimal(str(added_rate))
+        star_deltas[_star_column(added_rate)] += 1
+    if removed_rate is not None:
+        count_delta -= 1
+        sum_delta -= Decimal(str(removed_rate))
+        star_deltas[_star_column(removed_rate)] -= 1
+
+    new_count = BookRatingStats.review_count + count_delta
+    new_sum = BookRatingStats.rate_sum + sum_delta
+    query = insert(BookRatingStats).values(
+        book_id=book_id,
+        review_count=max(count_delta, 0),
+        rate_sum=max(sum_delta, 0),
+        avg_rate=round(sum_delta / count_delta, 2) if count_delta > 0 else 0,
+        **{column: max(delta, 0) for column, delta in star_deltas.items()},
+    )
+    query = query.on_conflict_do_update(
+        index_elements=[BookRatingStats.book_id],
+        set_={
+            "review_count": new_count,
+            "rate_sum": new_sum,
+            "avg_rate": case(
+                (new_count > 0, func.round(new_sum / new_count, 2)), else_=0
+            ),
+            **{
+                column: getattr(BookRatingStats, column) + delta
+                for column, delta in star_deltas.items()
+                if delta
+            },
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(query)
+
+
+async def rebuild_rating_stats(session: AsyncSession) -> int:
+    star = func.greatest(func.least(func.round(Review.rate), 5), 1)
+    stats_query = select(
+        Review.book_id,
+        func.count(Review.id),
+        func.sum(Review.rate),
+        func.round(func.avg(Review.rate), 2),
+        *[func.count(Review.id).filter(star == i) for i in range(1, 6)],
+    ).group_by(Review.book_id)
+
+    await session.execute(delete(BookRatingStats))
+    result = await session.execute(
+        insert(BookRatingStats).from_select(
+            [
+                "book_id",
+                "review_count",
+                "rate_sum",
+                "avg_rate",
+                *STAR_COLUMNS,
+            ],
+            stats_query,
+        )
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def get_review_by_id(
+    session: AsyncSession, review_id: uuid.UUID, user_id: int, for_update: bool = False
+):
     query = (
         select(
             Review,
@@ -17,6 +113,10 @@ async def get_review_by_id(session: AsyncSession, review_id: uuid.UUID, user_id:
         .where(Review.id == review_id)
         .where(Review.user_id == user_id)
     )
+    if for_update:
+        # Блокуємо рядок до commit: паралельні update/delete того самого відгуку
+        # чекають і бачать уже нову оцінку, тож дельта статистики не дублюється
+        query = query.with_for_update().execution_options(populate_existing=True)
     result = await session.execute(query)
     return result.scalars().first()
 
@@ -39,6 +139,119 @@ async def get_reviews_by_user(session: AsyncSession, user: User):
     return reviews.mappings().all()
 
 
+def review_row(row) -> dict:
+    # Відгук у формі ReviewResponse (ключі camelCase) — однаково в лістингу,
+    # на сторінці книги та в деталях книги
+    return {to_camel(key): value for key, value in row.items()}
+
+
+def _review_columns():
+    return (
+        Review.id,
+        Review.user_id,
+        Review.book_id,
+        Review.review_text,
+        Review.rate,
+        Review.review_date,
+        Review.created_at,
+        Review.updated_at,
+        User.first_name.label("review_name"),
+        User.avatar,
+    )
+
+
+async def get_reviews_by_book(
+    session: AsyncSession,
+    book_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort_by: str = "review_date",
+    sort_order: str = "desc",
+):
+    # Ключ keyset-пагінації: (review_date, id) або (rate, review_date, id)
+    if sort_by == "rate":
+        key_columns = [Review.rate, Review.review_date, Review.id]
+    else:
+        sort_by = "review_date"
+        key_columns = [Review.review_date, Review.id]
+    sort_order = "asc" if sort_order.lower() == "asc" else "desc"
+    scope = f"{sort_by}:{sort_order}"
+    direction = asc if sort_order == "asc" else desc
+
+    query = (
+        select(*_review_columns())
+        .join(User, User.id == Review.user_id)
+        .where(Review.book_id == book_id)
+        .order_by(*[direction(column) for column in key_columns])
+        .limit(limit + 1)
+    )
+    if cursor:
+        key = tuple_(*key_columns)
+        value = tuple_(*decode_cursor(cursor, scope))
+        query = query.where(key < value if sort_order == "desc" else key > value)
+
+    result = await session.execute(query)
+    reviews = result.mappings().all()
+
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        last = reviews[-1]
+        next_cursor = encode_cursor(scope, [last[c.key] for c in key_columns])
+    return reviews, next_cursor
+
+
+async def get_rating_histogram(session: AsyncSession, book_id: uuid.UUID) -> dict:
+    # Гістограма оцінок з book_rating_stats — один рядок за PK, без агрегації reviews
+    result = await session.execute(
+        select(BookRatingStats).where(BookRatingStats.book_id == book_id)
+    )
+    stats = result.scalars().first()
+    return {
+        "reviewCount": stats.review_count if stats else 0,
+        "avgRate": float(stats.avg_rate) if stats else 0.0,
+        "stars": {
+            str(i): getattr(stats, column) if stats else 0
+            for i, column in enumerate(STAR_COLUMNS, start=1)
+        },
+    }
+
+
+async def get_review_previews(
+    session: AsyncSession, book_ids: List[uuid.UUID], limit: int
+) -> Dict[uuid.UUID, List[dict]]:
+    ranked = (
+        select(
+            *_review_columns(),
+            func.row_number()
+            .over(
+                partition_by=Review.book_id,
+                order_by=(desc(Review.review_date), desc(Review.id)),
+            )
+            .label("position"),
+        )
+        .join(User, User.id == Review.user_id)
+        # Один параметр-масив замість IN ($1, $2, ...): SQL не залежить від розміру сторінки,
+        # тож prepared statement спільний для всіх сторінок
+        .where(Review.book_id == any_(literal(book_ids, ARRAY(UUID(as_uuid=True)))))
+        .subquery()
+    )
+    query = (
+        select(ranked)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.book_id, ranked.c.position)
+    )
+    result = await session.execute(query)
+
+    previews: Dict[uuid.UUID, List[dict]] = {}
+    for row in result.mappings().all():
+        review = dict(row)
+        review.pop("position")
+        review["rate"] = float(review["rate"])
+        previews.setdefault(review["book_id"], []).append(review_row(review))
+    return previews
+
+
 async def post_review(
     body: ReviewModel,
     user: User,
@@ -56,6 +269,7 @@ async def post_review(
         updated_at=datetime.now(),
     )
     session.add(review)
+    await _apply_rating_delta(session, body.book_id, added_rate=body.rate)
     await session.commit()
     await session.refresh(review)
     return review
@@ -67,8 +281,11 @@ async def update_review(
     user: User,
     session: AsyncSession,
 ) -> Review:
-    review = await get_review_by_id(session, review_id, user.id)
+    review = await get_review_by_id(session, review_id, user.id, for_update=True)
     if review:
+        await _apply_rating_delta(
+            session, review.book_id, added_rate=body.rate, removed_rate=review.rate
+        )
         review.review_text = body.review_text
         review.rate = body.rate
         review.updated_at = datetime.now()
@@ -78,8 +295,9 @@ async def update_review(
 
 
 async def remove_review(review_id: uuid.UUID, session: AsyncSession, user: User):
-    review = await get_review_by_id(session, review_id, user.id)
+    review = await get_review_by_id(session, review_id, user.id, for_update=True)
     if review:
+        await _apply_rating_delta(session, review.book_id, removed_rate=review.rate)
         await session.delete(review)
         await session.commit()
     return review
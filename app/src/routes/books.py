@@ -1,13 +1,52 @@
 import re
+import uuid
+from typing import List, Tuple
 
-from fastapi import APIRouter, Query
-from fastapi import Depends, HTTPException
+from fastapi import APIRouter, Query, Request, Response
+from fastapi import Depends, HTTPException, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.src.database.db import db
+from app.src.config.config import settings
+from app.src.database.connect import session_manager
+from app.src.database.db import db, db_readonly, readonly_db
+from app.src.database.replicas import is_pinned
+from app.src.entity.models import Book
 from app.src.repository import books as repository_books
-from app.src.schemas.books import BookPaginationResponse, BookFilterParams
-
+from app.src.repository import books_facets as repository_facets
+from app.src.repository import review as repository_reviews
+from app.src.repository.books_filter import normalize_filter_params
+from app.src.repository.catalog import get_catalog_version, get_book_version
+from app.src.schemas.books import (
+    BookPaginationResponse,
+    BookFilterParams,
+    BookSuggestion,
+    BookFacetsResponse,
+    BookDetailResponse,
+    BookBatchRequest,
+    BookBatchResponse,
+    BookPageResponse,
+)
+from app.src.schemas.review import ReviewPaginationResponse, ReviewResponse
+from app.src.services.http_cache import (
+    make_etag,
+    etag_matches,
+    LISTING_CACHE_CONTROL,
+    FACETS_CACHE_CONTROL,
+    SUGGEST_CACHE_CONTROL,
+    REVIEWS_CACHE_CONTROL,
+    BOOK_CACHE_CONTROL,
+)
+from app.src.services.response_cache import (
+    response_cache,
+    response_tags,
+    book_tag,
+    LISTING_TAG,
+)
+from app.src.services.page_parts import gather_parts
+from app.src.services.query_guard import catalog_query_limiter
+from app.src.services.serialization import dumps
+from app.src.services.single_flight import catalog_flight
+from app.src.services.suggest import suggest_index
 
 router = APIRouter(
     prefix="/books",
@@ -20,21 +59,13 @@ def camel_to_snake(name: str) -> str:
     return re.sub(r"([a-z])([A-Z])", r"\1_\2", name).lower()
 
 
-@router.get("/", response_model=BookPaginationResponse)
-async def get_all_books(
-    session: AsyncSession = Depends(db),
-    size: int = Query(10, ge=1, le=100),
-    page: int = Query(1, ge=1),
-    sort_by: str = Query(
-        "actualPrice",
-        alias="sortBy",
-        description="Sort field: actualPrice, rate, price, discount, createdAt, title, author, publicationYear",
-    ),
-    sort_order: str = Query(
-        "asc",
-        alias="sortOrder",
-        description="Sort order: asc or desc",
-    ),
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def book_filters(
     filter_params: BookFilterParams = Depends(),
     categories: str = Query(
         None,
@@ -53,27 +84,388 @@ async def get_all_books(
         alias="bookType",
         description="Фільтр за типом книги (Електронна книга, Аудіокнига, Паперова книга)(рядок, розділений комами)",
     ),
-):
+    categories_match: str = Query(
+        None,
+        alias="categoriesMatch",
+        pattern="^(any|all)$",
+        description="any — книга має хоча б одну з категорій (за замовчуванням), all — усі",
+    ),
+    target_ages_match: str = Query(
+        None,
+        alias="targetAgesMatch",
+        pattern="^(any|all)$",
+        description="any — хоча б одна з вікових груп (за замовчуванням), all — усі",
+    ),
+    book_type_match: str = Query(
+        None,
+        alias="bookTypeMatch",
+        pattern="^(any|all)$",
+        description="any — хоча б один з типів книги (за замовчуванням), all — усі",
+    ),
+) -> dict:
+    # Спільні фільтри каталогу для списку книг і фасетів
     filter_params_dict = filter_params.dict()
-    filter_params_dict["sort_by"] = camel_to_snake(sort_by)
-    filter_params_dict["sort_order"] = sort_order
     filter_params_dict["categories"] = categories
     filter_params_dict["target_ages"] = target_ages
     filter_params_dict["book_type"] = book_type
+    filter_params_dict["categories_match"] = categories_match
+    filter_params_dict["target_ages_match"] = target_ages_match
+    filter_params_dict["book_type_match"] = book_type_match
+    return filter_params_dict
+
+
+@router.get("/", response_model=BookPaginationResponse)
+async def get_all_books(
+    request: Request,
+    session: AsyncSession = Depends(db_readonly),
+    size: int = Query(10, ge=1, le=100),
+    page: int = Query(1, ge=1),
+    cursor: str = Query(
+        None,
+        description="Курсор з поля nextCursor попередньої відповіді. Якщо заданий, page ігнорується",
+    ),
+    reviews_preview: int = Query(
+        3,
+        ge=0,
+        le=10,
+        alias="reviewsPreview",
+        description="Скільки останніх відгуків вкладати в кожну книгу (0 — жодного)",
+    ),
+    count_mode: str = Query(
+        "exact",
+        alias="countMode",
+        description="Підрахунок totalBooks: exact, cached, estimate, hasNext (без підрахунку)",
+    ),
+    sort_by: str = Query(
+        "actualPrice",
+        alias="sortBy",
+        description="Sort field: actualPrice, rate, price, discount, createdAt, title, author, publicationYear, "
+        "relevance (with search)",
+    ),
+    sort_order: str = Query(
+        "asc",
+        alias="sortOrder",
+        description="Sort order: asc or desc",
+    ),
+    view: str = Query(
+        "full",
+        description="Набір полів книги: full (усі) або card (bookId, title, author, обкладинка, "
+        "price, actualPrice, rate, isAvailable)",
+    ),
+    fields: str = Query(
+        None,
+        description="Поля книги через кому (camelCase, наприклад title,author,price). "
+        "Має пріоритет над view",
+    ),
+    filter_params_dict: dict = Depends(book_filters),
+):
+    filter_params_dict["sort_by"] = camel_to_snake(sort_by)
+    filter_params_dict["sort_order"] = sort_order
 
     limit = size
     offset = (page - 1) * limit
 
-    total_books, books_repository = await repository_books.get_all_books(
-        session, limit, offset, filter_params_dict
+    count_mode = camel_to_snake(count_mode)
+    # Клієнт щойно писав (read-your-writes): читає з primary в обхід спільних кешів і
+    # спільних запитів, які могли бути заповнені з репліки, що відстає
+    pinned = is_pinned(request)
+    if pinned and count_mode == "cached":
+        count_mode = "exact"
+    book_fields = repository_books.resolve_book_fields(view, fields)
+    if fields:
+        # fields= має пріоритет над view: зріз images до обкладинки лише для пресету card
+        view = "full"
+    cache_key = (
+        normalize_filter_params(filter_params_dict, exclude=()),
+        size,
+        None if cursor else page,
+        cursor,
+        count_mode,
+        reviews_preview,
+        view,
+        book_fields,
+    )
+    if_none_match = request.headers.get("if-none-match")
+    cached = None if pinned else response_cache.get(cache_key)
+    if cached is None and if_none_match:
+        # Клієнт уже має відповідь: звіряємо лише версію каталогу, без запиту сторінки.
+        # Сесія db_readonly для закріпленого клієнта вже веде на primary
+        etag = make_etag(await get_catalog_version(session), cache_key)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, LISTING_CACHE_CONTROL)
+        # Сторінку читає окрема сесія — не тримаємо два з'єднання на один запит
+        await session.release()
+
+    async def build_entry() -> Tuple[str, bytes]:
+        # Власна сесія: спільний запит не залежить від життєвого циклу запиту-ініціатора
+        # Місце в обмежувачі важких запитів і власний бюджет statement_timeout
+        async with catalog_query_limiter.slot(), session_manager.session(
+            readonly=not pinned,
+            statement_timeout=settings.books_listing_statement_timeout_ms,
+        ) as flight_session:
+            # Версію читаємо до сторінки: якщо каталог зміниться посередині, ETag лише застаріє
+            etag = make_etag(await get_catalog_version(flight_session), cache_key)
+            total_books, books_repository, next_cursor = (
+                await repository_books.get_all_books(
+                    flight_session,
+                    limit,
+                    offset,
+                    filter_params_dict,
+                    cursor,
+                    count_mode,
+                    reviews_preview,
+                    view,
+                    book_fields,
+                )
+            )
+        if total_books == 0 or (total_books is None and not books_repository):
+            raise HTTPException(status_code=404, detail="Not found any book")
+        total_pages = (
+            (total_books + limit - 1) // limit if total_books is not None else None
+        )
+        # Форма BookPaginationResponse (response_model лишається для документації),
+        # але без валідації Pydantic: рядки з БД уже мають ключі та типи відповіді
+        body = dumps(
+            {
+                "totalBooks": total_books,
+                "totalPages": total_pages,
+                "currentPage": (offset // limit) + 1,
+                "size": size,
+                "books": books_repository,
+                "hasNext": next_cursor is not None,
+                "nextCursor": next_cursor,
+            }
+        )
+        # Кешуємо вже серіалізоване тіло: повторний запит не звертається ні до БД, ні до кодування
+        if not pinned:
+            response_cache.set(
+                cache_key,
+                (etag, body),
+                size=len(body),
+                tags=response_tags(book["bookId"] for book in books_repository),
+            )
+        return etag, body
+
+    if cached is None:
+        # Однакові паралельні запити (наприклад, після закінчення TTL) чекають на один запит до БД
+        # Якщо клієнт відключився, запит до БД скасовується (коли ніхто інший його не чекає)
+        work = build_entry() if pinned else catalog_flight.do(cache_key, build_entry)
+        cached = await catalog_query_limiter.run_until_disconnect(request, work)
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, LISTING_CACHE_CONTROL)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": LISTING_CACHE_CONTROL},
+    )
+
+
+@router.get("/suggest", response_model=List[BookSuggestion])
+async def suggest_books(
+    response: Response,
+    q: str = Query(
+        min_length=1, max_length=100, description="Початок назви або автора"
+    ),
+    limit: int = Query(10, ge=1, le=20),
+):
+    # Підказки для рядка пошуку з індексу в пам'яті, без запиту до БД
+    response.headers["Cache-Control"] = SUGGEST_CACHE_CONTROL
+    return suggest_index.search(q, limit)
+
+
+@router.get("/facets", response_model=BookFacetsResponse)
+async def get_book_facets(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(
+        readonly_db(settings.books_facets_statement_timeout_ms)
+    ),
+    filter_params_dict: dict = Depends(book_filters),
+):
+    etag = make_etag(
+        await get_catalog_version(session), normalize_filter_params(filter_params_dict)
     )
-    if total_books == 0:
-        raise HTTPException(status_code=404, detail="Not found any book")
-    total_pages = (total_books + limit - 1) // limit
-    return BookPaginationResponse(
-        total_books=total_books,
-        total_pages=total_pages,
-        current_page=(offset // limit) + 1,
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, FACETS_CACHE_CONTROL)
+
+    async def load_facets():
+        async with catalog_query_limiter.slot():
+            # Закріплений клієнт не бере й не заповнює кеш фасетів даними з репліки
+            return await repository_facets.get_facets(
+                session, filter_params_dict, use_cache=not is_pinned(request)
+            )
+
+    facets = await catalog_query_limiter.run_until_disconnect(request, load_facets())
+    # Читання завершено: з'єднання повертається в пул до серіалізації відповіді
+    await session.release()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = FACETS_CACHE_CONTROL
+    return BookFacetsResponse(**facets)
+
+
+@router.post("/batch", response_model=BookBatchResponse)
+async def get_books_batch(
+    body: BookBatchRequest,
+    session: AsyncSession = Depends(db_readonly),
+):
+    # Кошик, обране, замовлення: до 100 книг за id, ISBN чи артикулом одним запитом
+    book_fields = repository_books.resolve_book_fields(body.view)
+    books, missing = await repository_books.get_books_batch(
+        session,
+        body.ids,
+        body.isbns,
+        body.article_numbers,
+        book_fields,
+        body.view,
+    )
+    await session.release()
+    return Response(
+        content=dumps({"books": books, "missing": missing}),
+        media_type="application/json",
+    )
+
+
+@router.get("/{book_id}/reviews", response_model=ReviewPaginationResponse)
+async def get_book_reviews(
+    response: Response,
+    session: AsyncSession = Depends(db_readonly),
+    book_id: uuid.UUID = Path(),
+    size: int = Query(10, ge=1, le=50),
+    cursor: str = Query(
+        None,
+        description="Курсор з поля nextCursor попередньої відповіді",
+    ),
+    sort_by: str = Query(
+        "reviewDate",
+        alias="sortBy",
+        description="Sort field: reviewDate, rate",
+    ),
+    sort_order: str = Query(
+        "desc",
+        alias="sortOrder",
+        description="Sort order: asc or desc",
+    ),
+):
+    reviews, next_cursor = await repository_reviews.get_reviews_by_book(
+        session, book_id, size, cursor, camel_to_snake(sort_by), sort_order
+    )
+    if not reviews and not cursor and await session.get(Book, book_id) is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    await session.release()
+    response.headers["Cache-Control"] = REVIEWS_CACHE_CONTROL
+    return ReviewPaginationResponse(
         size=size,
-        books=books_repository,
+        reviews=[ReviewResponse(**dict(review)) for review in reviews],
+        has_next=next_cursor is not None,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{book_id}/page", response_model=BookPageResponse)
+async def get_book_page(
+    request: Request,
+    book_id: uuid.UUID = Path(),
+    reviews_size: int = Query(10, ge=1, le=50, alias="reviewsSize"),
+):
+
+    async def load_parts():
+        # Деталі, перша сторінка відгуків, гістограма оцінок і схожі книги — паралельно
+        async with catalog_query_limiter.slot():
+            return await gather_parts(
+                {
+                    "book": lambda s: repository_books.get_book_by_id(s, book_id),
+                    "reviews": lambda s: repository_reviews.get_reviews_by_book(
+                        s, book_id, reviews_size
+                    ),
+                    "rating": lambda s: repository_reviews.get_rating_histogram(
+                        s, book_id
+                    ),
+                    "related": lambda s: repository_books.get_similar_books(s, book_id),
+                },
+                settings.book_page_part_timeout,
+                readonly=not is_pinned(request),
+            )
+
+    parts, errors = await catalog_query_limiter.run_until_disconnect(
+        request, load_parts()
+    )
+    # Без самої книги сторінка не має сенсу — решта частин може бути відсутньою
+    if "book" in errors:
+        raise HTTPException(status_code=503, detail="Book is temporarily unavailable")
+    if parts["book"] is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    reviews = None
+    if parts["reviews"] is not None:
+        review_rows, next_cursor = parts["reviews"]
+        reviews = {
+            "size": reviews_size,
+            "reviews": [repository_reviews.review_row(row) for row in review_rows],
+            "hasNext": next_cursor is not None,
+            "nextCursor": next_cursor,
+        }
+    body = dumps(
+        {
+            "book": parts["book"],
+            "reviews": reviews,
+            "rating": parts["rating"],
+            "related": parts["related"],
+            "errors": errors,
+        }
+    )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": BOOK_CACHE_CONTROL},
+    )
+
+
+@router.get("/{book_id}", response_model=BookDetailResponse)
+async def get_book(
+    request: Request,
+    # Primary, а не репліка: ETag і 304 не мають підтверджувати застарілу версію книги
+    session: AsyncSession = Depends(db),
+    book_id: uuid.UUID = Path(),
+    include: str = Query(
+        None,
+        description="Додатково через кому: reviews (останні відгуки), similar (схожі книги)",
+    ),
+):
+    include = repository_books.resolve_book_includes(include)
+    cache_key = ("book", book_id, include)
+    if_none_match = request.headers.get("if-none-match")
+
+    cached = response_cache.get(cache_key)
+    if cached is None:
+        version = await get_book_version(session, book_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        if include:
+            # Схожі книги залежать від каталогу, а превʼю відгуків — ще й від імен
+            # і аватарів авторів; обидва змінюють версію catalog_state
+            version = (version, await get_catalog_version(session))
+        etag = make_etag(version, cache_key)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, BOOK_CACHE_CONTROL)
+
+        book = await repository_books.get_book_by_id(session, book_id, include)
+        if book is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        await session.release()
+        body = dumps(book)
+        # Схожі книги залежать від решти каталогу — такий запис скидається разом зі списками
+        tags = {book_tag(book_id)}
+        if "similar" in include:
+            tags.add(LISTING_TAG)
+        cached = (etag, body)
+        response_cache.set(cache_key, cached, size=len(body), tags=tags)
+
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, BOOK_CACHE_CONTROL)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": BOOK_CACHE_CONTROL},
     )
@@ -19,10 +19,13 @@ router = APIRouter(
 
 @router.get("/", response_model=List[ReviewResponse])
 async def get_reviews_by_user(
+    # Та сама сесія db, що й в get_current_user: одне з'єднання на запит,
+    # а власні відгуки користувача читаються з primary
     session: AsyncSession = Depends(db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
     reviews = await repository_reviews.get_reviews_by_user(session, current_user)
+    await session.release()
     print(f"reviews {reviews}")
     if not reviews:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
@@ -1,12 +1,15 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 from fastapi import HTTPException
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from pydantic.alias_generators import to_camel
 import uuid
 
 from app.src.entity import enums
+from app.src.schemas.review import ReviewPaginationResponse
+
+BOOK_BATCH_MAX_KEYS = 100
 
 
 class BookResponse(BaseModel):
@@ -68,8 +71,9 @@ class BookResponse(BaseModel):
         description="Масив URL-адрес до фотографій книги"
     )
     reviews: Optional[List] = Field(
-        description="Масив відгуків юзерів і критиків про книгу"
+        description="Останні відгуки про книгу (повний список — /books/{id}/reviews)"
     )
+    review_count: int = Field(default=0, ge=0, description="Кількість відгуків")
     is_bestseller: bool = Field(description="Чи є книга бестселером?")
     is_publish: bool = Field(description="Чи доступна книга для продажу?")
     is_gifted: bool = Field(description="Чи подарункове видання?")
@@ -90,12 +94,159 @@ class BookResponse(BaseModel):
     )
 
 
+class BookCardResponse(BaseModel):
+    # Компактна картка книги (view=card): лише поля для сітки каталогу
+    book_id: uuid.UUID
+    title: str
+    author: str
+    images: List[str] = Field(description="Обкладинка (перше зображення)")
+    price: float
+    actual_price: float
+    rate: float
+    is_available: bool
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class BookDetailResponse(BookResponse):
+    similar: Optional[List[BookCardResponse]] = Field(
+        default=None, description="Схожі книги (лише з include=similar)"
+    )
+
+
+class BookRatingHistogram(BaseModel):
+    review_count: int
+    avg_rate: float
+    stars: Dict[str, int] = Field(description="Кількість відгуків за оцінками 1-5")
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class BookPageResponse(BaseModel):
+    book: BookResponse
+    # Частини, що не вклалися в таймаут чи впали, — null з причиною в errors
+    reviews: Optional[ReviewPaginationResponse] = None
+    rating: Optional[BookRatingHistogram] = None
+    related: Optional[List[BookCardResponse]] = None
+    errors: Dict[str, str] = Field(
+        default={}, description="Частини сторінки, які не вдалося отримати"
+    )
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class BookBatchRequest(BaseModel):
+    ids: List[uuid.UUID] = Field(default=[], description="Ідентифікатори книг")
+    isbns: List[str] = Field(default=[], description="ISBN книг")
+    article_numbers: List[str] = Field(default=[], description="Артикули книг")
+    view: str = Field(default="full", description="Набір полів книги: full або card")
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+    @model_validator(mode="after")
+    def validate_keys(self):
+        keys_count = len(self.ids) + len(self.isbns) + len(self.article_numbers)
+        if keys_count == 0:
+            raise ValueError("At least one of ids, isbns or articleNumbers is required")
+        if keys_count > BOOK_BATCH_MAX_KEYS:
+            raise ValueError(f"No more than {BOOK_BATCH_MAX_KEYS} keys per request")
+        return self
+
+
+class BookBatchMissing(BaseModel):
+    ids: List[uuid.UUID] = []
+    isbns: List[str] = []
+    article_numbers: List[str] = []
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class BookBatchResponse(BaseModel):
+    books: List[Union[BookResponse, BookCardResponse]] = Field(
+        description="Знайдені книги в порядку ключів запиту"
+    )
+    missing: BookBatchMissing = Field(description="Ключі, за якими книг не знайдено")
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
 class BookPaginationResponse(BaseModel):
-    total_books: int
-    total_pages: int
+    total_books: Optional[int] = Field(
+        description="Кількість книг (оцінка для countMode=estimate, null для hasNext)"
+    )
+    total_pages: Optional[int]
     current_page: int
     size: int
     books: List[BookResponse]
+    has_next: bool = Field(default=False, description="Чи є наступна сторінка")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Курсор наступної сторінки (передається у параметр cursor)",
+    )
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class BookSuggestion(BaseModel):
+    book_id: uuid.UUID
+    title: str
+    author: str
+    image: Optional[str] = Field(default=None, description="URL обкладинки")
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class BookFacetsResponse(BaseModel):
+    total_books: int = Field(description="Кількість книг з усіма фільтрами")
+    price_min: Optional[float] = Field(description="Мінімальна actual_price")
+    price_max: Optional[float] = Field(description="Максимальна actual_price")
+    # Кожен фасет рахується з усіма фільтрами, крім власного
+    genre: Dict[str, int]
+    categories: Dict[str, int]
+    target_ages: Dict[str, int]
+    language: Dict[str, int]
+    cover_type: Dict[str, int]
+    book_type: Dict[str, int]
 
     model_config = ConfigDict(
         alias_generator=to_camel,
@@ -108,6 +259,11 @@ class BookPaginationResponse(BaseModel):
 class BookFilterParams(BaseModel):
     author: Optional[str] = Field(default=None, description="Фільтр за ім'ям автора")
     title: Optional[str] = Field(default=None, description="Фільтр за назвою книги")
+    search: Optional[str] = Field(
+        default=None,
+        description="Пошук за назвою, автором, оригінальною назвою, серією та видавництвом "
+        "(стійкий до опечаток; для сортування за збігом — sortBy=relevance)",
+    )
     genre: Optional[str] = Field(default=None, description="Фільтр за жанром книги")
     paper_type: Optional[str] = Field(
         default=None, description="Фільтр за типом паперу"
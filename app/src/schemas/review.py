@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 from pydantic.alias_generators import to_camel
@@ -26,7 +26,8 @@ class ReviewResponse(ReviewModel):
     user_id: uuid.UUID
     book_id: uuid.UUID
     review_name: str = Field(description="Ім'я користувача")
-    avatar: str = Field(description="Посилання на аватар")
+    # users.avatar nullable: у користувача може не бути аватара
+    avatar: Optional[str] = Field(default=None, description="Посилання на аватар")
     created_at: datetime = Field(description="Дата створення")
     updated_at: datetime = Field(description="Дата оновлення")
 
@@ -38,5 +39,22 @@ class ReviewResponse(ReviewModel):
     )
 
 
+class ReviewPaginationResponse(BaseModel):
+    size: int
+    reviews: List[ReviewResponse]
+    has_next: bool = Field(default=False, description="Чи є наступна сторінка")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Курсор наступної сторінки (передається у параметр cursor)",
+    )
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
+
+
 if __name__ == "__main__":
     print(datetime.utcnow())
@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+
+class TTLCache:
+    """
+    LRU-кеш у пам'яті процесу з TTL на запис, обмеженням кількості записів
+    і (за потреби) бюджетом пам'яті в байтах. Записи можна позначати тегами
+    й інвалідовувати за тегом.
+    """
+
+    def __init__(
+        self, ttl: float, max_entries: int = 1024, max_bytes: Optional[int] = None
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (expires_at, value, size, tags)
+        self._data: OrderedDict = OrderedDict()
+        self._keys_by_tag: dict = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if item[0] < time.monotonic():
+            self._pop(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        size: int = 0,
+        tags: Iterable[str] = (),
+    ) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._pop(key)
+        tags = frozenset(tags)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value, size, tags)
+        self._bytes += size
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        # Витісняємо найдавніше використані записи, доки не вкладемося в ліміти
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+    def _pop(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        self._bytes -= item[2]
+        for tag in item[3]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        keys = set()
+        for tag in tags:
+            keys |= self._keys_by_tag.get(tag, set())
+        for key in keys:
+            self._pop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._keys_by_tag.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,92 @@
+from typing import Callable, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.src.entity.models import (
+    Book,
+    BookInfo,
+    Category,
+    TargetAge,
+    BookType,
+    Image,
+    Review,
+    User,
+)
+
+BOOKS_TAG = "books"
+REVIEWS_TAG = "reviews"
+# Публікує CatalogRefresher після оновлення рядків catalog_books
+CATALOG_TAG = "catalog"
+# Змінились ім'я чи аватар автора відгуків (або його видалено) — вони є в превʼю відгуків
+REVIEWERS_TAG = "reviewers"
+REVIEWER_FIELDS = ("first_name", "avatar")
+
+_CHANGES_KEY = "catalog_changes"
+
+
+class CatalogEvents:
+    """
+    Збирає id змінених книг під час flush і після commit сповіщає підписників
+    (кеші, індекси тощо). Після rollback зібрані зміни відкидаються.
+    """
+
+    def __init__(self):
+        self._subscribers: list = []
+
+    def subscribe(self, callback: Callable[[Set, Set[str]], None]):
+        self._subscribers.append(callback)
+        return callback
+
+    def notify(self, book_ids: Set, tags: Set[str]) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(book_ids, tags)
+            except Exception as e:
+                print(f"Catalog subscriber failed: {e}")
+
+
+catalog_events = CatalogEvents()
+
+
+def _book_id(obj):
+    if isinstance(obj, Book):
+        return obj.id, BOOKS_TAG
+    if isinstance(obj, (BookInfo, Category, TargetAge, BookType, Image)):
+        return obj.book_id, BOOKS_TAG
+    if isinstance(obj, Review):
+        return obj.book_id, REVIEWS_TAG
+    return None, None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    book_ids, tags = session.info.setdefault(_CHANGES_KEY, (set(), set()))
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User) and (
+            obj in session.deleted
+            or any(
+                inspect(obj).attrs[field].history.has_changes()
+                for field in REVIEWER_FIELDS
+            )
+        ):
+            tags.add(REVIEWERS_TAG)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        book_id, tag = _book_id(obj)
+        if tag is None:
+            continue
+        if book_id is not None:
+            book_ids.add(book_id)
+        tags.add(tag)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes and changes[1]:
+        catalog_events.notify(*changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session, previous_transaction):
+    session.info.pop(_CHANGES_KEY, None)
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Optional
+
+from app.src.config.config import settings
+from app.src.database.connect import session_manager
+from app.src.repository.catalog import (
+    refresh_catalog_books,
+    get_stale_catalog_book_ids,
+)
+from app.src.services.catalog_events import (
+    catalog_events,
+    BOOKS_TAG,
+    REVIEWS_TAG,
+    CATALOG_TAG,
+)
+
+
+class CatalogRefresher:
+    """
+    Фонове оновлення catalog_books. Зміни книг, зображень і відгуків накопичуються
+    й оновлюються пакетом після короткої затримки; періодичний sweep підбирає
+    рядки, що розійшлися з джерелом (наприклад, зміни поза цим процесом).
+    """
+
+    def __init__(self, delay: float, interval: float):
+        self.delay = delay
+        self.interval = interval
+        self._dirty: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, book_ids, tags) -> None:
+        if not book_ids or not ({BOOKS_TAG, REVIEWS_TAG} & set(tags)):
+            return
+        self._dirty.update(book_ids)
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = loop.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        # Зміни, що прийшли під час оновлення, забираємо наступним пакетом
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            book_ids, self._dirty = self._dirty, set()
+            try:
+                async with session_manager.session() as session:
+                    await refresh_catalog_books(session, book_ids)
+                catalog_events.notify(book_ids, {CATALOG_TAG})
+            except Exception as e:
+                # Повернемо id у чергу — їх підхопить наступна зміна або sweep
+                self._dirty.update(book_ids)
+                print(f"Catalog refresh failed: {e}")
+                return
+
+    async def sweep(self, batch_size: int = 1000) -> int:
+        refreshed = 0
+        async with session_manager.session() as session:
+            while True:
+                book_ids = await get_stale_catalog_book_ids(session, batch_size)
+                refreshed += await refresh_catalog_books(session, book_ids)
+                if book_ids:
+                    catalog_events.notify(set(book_ids), {CATALOG_TAG})
+                if len(book_ids) < batch_size:
+                    return refreshed
+
+    async def _run_sweeps(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Catalog sweep failed: {e}")
+
+    def start(self) -> None:
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.get_running_loop().create_task(
+                self._run_sweeps()
+            )
+
+
+catalog_refresher = CatalogRefresher(
+    settings.catalog_refresh_delay, settings.catalog_refresh_interval
+)
+catalog_events.subscribe(catalog_refresher.mark_dirty)
@@ -0,0 +1,29 @@
+import hashlib
+from typing import Optional
+
+# Політики Cache-Control для reverse proxy: відповіді каталогу анонімні й однакові
+# для всіх клієнтів, тож їх можна кешувати спільно й перевіряти через ETag
+LISTING_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+FACETS_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=120"
+SUGGEST_CACHE_CONTROL = "public, max-age=60"
+REVIEWS_CACHE_CONTROL = "public, max-age=30"
+BOOK_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=120"
+
+
+def make_etag(*parts) -> str:
+    # Слабкий ETag: однакова версія каталогу + однакові параметри => однаковий зміст
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Для If-None-Match порівняння слабке: префікс W/ не враховується
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.database.connect import session_manager
+
+PartQuery = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def _run_part(query: PartQuery, timeout: float, readonly: bool):
+    # Кожна частина — окрема сесія, тобто окреме з'єднання з пулу: запити йдуть паралельно
+    # statement_timeout = таймаут частини: після wait_for запит не лишається працювати в БД
+    async with session_manager.session(
+        readonly=readonly, statement_timeout=int(timeout * 1000)
+    ) as session:
+        return await asyncio.wait_for(query(session), timeout)
+
+
+async def gather_parts(
+    parts: Dict[str, PartQuery], timeout: float, readonly: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Виконує частини складеної сторінки одночасно. Час відповіді дорівнює найповільнішій
+    частині, а не сумі. Частина, що впала чи не вклалася в timeout, повертається як None
+    з причиною в errors — решта сторінки все одно віддається.
+    """
+    names = list(parts)
+    results = await asyncio.gather(
+        *(_run_part(parts[name], timeout, readonly) for name in names),
+        return_exceptions=True,
+    )
+    data, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            data[name], errors[name] = None, "timeout"
+        elif isinstance(result, HTTPException):
+            data[name], errors[name] = None, str(result.detail)
+        elif isinstance(result, Exception):
+            print(f"Page part '{name}' failed: {result}")
+            data[name], errors[name] = None, "unavailable"
+        else:
+            data[name] = result
+    return data, errors
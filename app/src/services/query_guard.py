@@ -0,0 +1,82 @@
+import asyncio
+import contextlib
+from typing import Any, Awaitable
+
+from fastapi import HTTPException, Request
+
+from app.src.config.config import settings
+
+# Статус nginx для запиту, який клієнт закрив раніше за відповідь
+CLIENT_CLOSED_REQUEST = 499
+DISCONNECT_POLL_INTERVAL = 0.1
+
+
+class QueryLimiter:
+    """
+    Обмежує кількість одночасних важких запитів каталогу на воркер. Коли всі
+    місця зайняті довше за queue_timeout, запит одразу отримує 503 з Retry-After,
+    а не стоїть у черзі за з'єднанням пулу.
+    """
+
+    def __init__(self, limit: int, queue_timeout: float, retry_after: int):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Catalog is busy, please retry",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    async def run_until_disconnect(self, request: Request, work: Awaitable) -> Any:
+        """
+        Виконує work, поки клієнт на зв'язку. Якщо з'єднання закрито, задача
+        скасовується: asyncpg надсилає серверу cancel, і запит у PostgreSQL зупиняється.
+        """
+        task = asyncio.ensure_future(work)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+                if done:
+                    return task.result()
+                if await request.is_disconnected():
+                    self.cancelled += 1
+                    task.cancel()
+                    raise HTTPException(
+                        status_code=CLIENT_CLOSED_REQUEST, detail="Client disconnected"
+                    )
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "rejected": self.rejected,
+            "cancelled_on_disconnect": self.cancelled,
+        }
+
+
+catalog_query_limiter = QueryLimiter(
+    limit=settings.catalog_query_concurrency,
+    queue_timeout=settings.catalog_query_queue_timeout,
+    retry_after=settings.catalog_query_retry_after,
+)
@@ -0,0 +1,47 @@
+import uuid
+from typing import Iterable
+
+from app.src.config.config import settings
+from app.src.services.cache import TTLCache
+from app.src.services.catalog_events import (
+    catalog_events,
+    BOOKS_TAG,
+    REVIEWS_TAG,
+    CATALOG_TAG,
+    REVIEWERS_TAG,
+)
+
+# Тег усіх відповідей, що залежать від складу каталогу (списки книг)
+LISTING_TAG = "catalog"
+
+
+def book_tag(book_id: uuid.UUID) -> str:
+    return f"book:{book_id}"
+
+
+def response_tags(book_ids: Iterable[uuid.UUID]) -> set:
+    return {LISTING_TAG, *(book_tag(book_id) for book_id in book_ids)}
+
+
+# Готові JSON-відповіді каталогу; розмір запису — довжина тіла в байтах
+response_cache = TTLCache(
+    ttl=settings.response_cache_ttl,
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+)
+
+
+@catalog_events.subscribe
+def _invalidate_response_cache(book_ids, tags):
+    if REVIEWERS_TAG in tags:
+        # Автор міг залишити відгуки будь-де: превʼю в списках і на сторінках книг
+        response_cache.clear()
+    elif CATALOG_TAG in tags:
+        # catalog_books оновлено: зміна ціни чи категорій може змінити склад будь-якого списку,
+        # а ETag сторінок книг залежить від refreshed_at
+        response_cache.invalidate_tags(
+            [LISTING_TAG, *(book_tag(book_id) for book_id in book_ids)]
+        )
+    elif BOOKS_TAG in tags or REVIEWS_TAG in tags:
+        # Одразу після запису прибираємо відповіді, що містять змінені книги
+        response_cache.invalidate_tags([book_tag(book_id) for book_id in book_ids])
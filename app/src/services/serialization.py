@@ -0,0 +1,18 @@
+from decimal import Decimal
+
+import orjson
+
+
+def _default(value):
+    # orjson сам кодує UUID, datetime та Enum (за значенням); Numeric з БД — Decimal
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(obj) -> bytes:
+    """
+    Швидке кодування в JSON-байти для даних, що вже мають форму відповіді
+    (ключі в camelCase) і прийшли з БД, тож повторна валідація Pydantic не потрібна.
+    """
+    return orjson.dumps(obj, default=_default)
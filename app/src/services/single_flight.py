@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import HTTPException
+
+from app.src.config.config import settings
+
+
+class SingleFlight:
+    """
+    Об'єднує однакові паралельні виклики: перший запит із ключем виконує роботу,
+    решта чекають на той самий asyncio.Task і отримують його результат або виняток.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+        self.abandoned = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield: скасування одного з клієнтів не скасовує спільний запит для інших
+            return await asyncio.wait_for(
+                asyncio.shield(task), self.timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail="Request timed out")
+        except asyncio.CancelledError:
+            # Скасовано останнього, хто чекав (клієнти відключилися) — запит до БД
+            # більше нікому не потрібен, тож зупиняємо і його
+            if self._waiters[task] == 1 and not task.done():
+                self.abandoned += 1
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        # Після завершення (успішного чи з помилкою) наступний виклик піде в БД знову
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Позначаємо виняток як отриманий, якщо всі очікувачі вже пішли за таймаутом
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "timeouts": self.timeouts,
+            "abandoned": self.abandoned,
+        }
+
+
+catalog_flight = SingleFlight(timeout=settings.single_flight_timeout)
@@ -0,0 +1,149 @@
+import asyncio
+import bisect
+import re
+import unicodedata
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, select
+
+from app.src.database.connect import session_manager
+from app.src.entity.models import Book, Image
+from app.src.services.catalog_events import catalog_events, BOOKS_TAG
+
+
+def normalize(text: str) -> str:
+    # Регістр, діакритика та пунктуація не впливають на збіг ("Їжак" ~ "іжак")
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def _prefix_keys(text: str) -> List[str]:
+    # Ключ для кожного слова: "гаррі поттер" -> ["гаррі поттер", "поттер"]
+    words = normalize(text).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class SuggestIndex:
+    """
+    Префіксний індекс назв і авторів у пам'яті процесу для підказок пошуку.
+    Відсортований список ключів + bisect, тож пошук не звертається до Postgres.
+    """
+
+    def __init__(self):
+        self._entries: Dict[uuid.UUID, dict] = {}
+        self._keys: List[Tuple[str, str]] = []
+        self._keys_by_book: Dict[uuid.UUID, List[Tuple[str, str]]] = {}
+        self._tasks: set = set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, book_id: uuid.UUID) -> None:
+        self._entries.pop(book_id, None)
+        for key in self._keys_by_book.pop(book_id, []):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    @staticmethod
+    def _entry_keys(book_id: uuid.UUID, title: str, author: str) -> set:
+        return {
+            (key, str(book_id)) for key in (*_prefix_keys(title), *_prefix_keys(author))
+        }
+
+    def _add(self, book_id: uuid.UUID, title: str, author: str, image) -> None:
+        self._remove(book_id)
+        self._entries[book_id] = {
+            "book_id": book_id,
+            "title": title,
+            "author": author,
+            "image": image,
+        }
+        keys = self._entry_keys(book_id, title, author)
+        for key in keys:
+            bisect.insort(self._keys, key)
+        self._keys_by_book[book_id] = list(keys)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        position = bisect.bisect_left(self._keys, (prefix, ""))
+        while position < len(self._keys) and len(results) < limit:
+            key, book_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            if book_id not in seen:
+                seen.add(book_id)
+                results.append(self._entries[uuid.UUID(book_id)])
+            position += 1
+        return results
+
+    @staticmethod
+    def _query(book_ids: Iterable[uuid.UUID] = None):
+        query = (
+            select(
+                Book.id,
+                Book.title,
+                Book.author,
+                func.min(Image.image_url).label("image"),
+            )
+            .outerjoin(Image, Image.book_id == Book.id)
+            .group_by(Book.id)
+        )
+        if book_ids is not None:
+            query = query.where(Book.id.in_(list(book_ids)))
+        return query
+
+    async def rebuild(self) -> None:
+        async with session_manager.session() as session:
+            result = await session.execute(self._query())
+            rows = result.all()
+        # Будуємо нові структури й підміняємо разом, щоб пошук не бачив порожній індекс
+        entries, keys_by_book = {}, {}
+        for row in rows:
+            entries[row.id] = {
+                "book_id": row.id,
+                "title": row.title,
+                "author": row.author,
+                "image": row.image,
+            }
+            keys_by_book[row.id] = list(self._entry_keys(row.id, row.title, row.author))
+        self._keys = sorted(key for keys in keys_by_book.values() for key in keys)
+        self._entries = entries
+        self._keys_by_book = keys_by_book
+
+    async def refresh(self, book_ids: Iterable[uuid.UUID]) -> None:
+        book_ids = set(book_ids)
+        async with session_manager.session() as session:
+            result = await session.execute(self._query(book_ids))
+            rows = result.all()
+        for row in rows:
+            self._add(row.id, row.title, row.author, row.image)
+        # Книги, яких більше немає в БД, прибираємо з індексу
+        for book_id in book_ids - {row.id for row in rows}:
+            self._remove(book_id)
+
+    def schedule_refresh(self, book_ids, tags) -> None:
+        if BOOKS_TAG not in tags or not book_ids:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.refresh(book_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Suggest index refresh failed: {task.exception()}")
+
+
+suggest_index = SuggestIndex()
+catalog_events.subscribe(suggest_index.schedule_refresh)
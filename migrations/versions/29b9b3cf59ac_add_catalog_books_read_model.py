@@ -0,0 +1,151 @@
+"""add_catalog_books_read_model
+
+Revision ID: 29b9b3cf59ac
+Revises: 6e543394b41f
+Create Date: 2026-10-18 14:02:17.530961
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "29b9b3cf59ac"
+down_revision: Union[str, None] = "6e543394b41f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _enum(name: str):
+    return postgresql.ENUM(name=name, create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalog_books",
+        sa.Column("book_id", sa.UUID(), nullable=False),
+        sa.Column("title", sa.String(length=250), nullable=False),
+        sa.Column("author", sa.String(length=100), nullable=False),
+        sa.Column("original_title", sa.String(length=250), nullable=True),
+        sa.Column("genre", _enum("genreenum"), nullable=False),
+        sa.Column(
+            "categories",
+            postgresql.ARRAY(_enum("categoriesenum")),
+            server_default="{}",
+            nullable=False,
+        ),
+        sa.Column(
+            "target_ages",
+            postgresql.ARRAY(_enum("targetagesenum")),
+            server_default="{}",
+            nullable=False,
+        ),
+        sa.Column(
+            "book_type",
+            postgresql.ARRAY(_enum("booktypeenum")),
+            server_default="{}",
+            nullable=False,
+        ),
+        sa.Column("series", sa.String(length=200), nullable=True),
+        sa.Column("publisher", sa.String(length=200), nullable=True),
+        sa.Column("publication_year", sa.Integer(), nullable=True),
+        sa.Column("page_count", sa.Integer(), nullable=True),
+        sa.Column("paper_type", _enum("papertypeenum"), nullable=True),
+        sa.Column("language", _enum("languageenum"), nullable=False),
+        sa.Column("original_language", _enum("languageenum"), nullable=False),
+        sa.Column("translator", sa.String(length=100), nullable=True),
+        sa.Column("cover_type", _enum("covertypeenum"), nullable=True),
+        sa.Column("weight", sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column("dimensions", sa.String(length=20), nullable=True),
+        sa.Column("isbn", sa.String(length=50), nullable=True),
+        sa.Column("article_number", sa.String(length=50), nullable=True),
+        sa.Column("price", sa.Numeric(), nullable=False),
+        sa.Column("actual_price", sa.Numeric(), nullable=True),
+        sa.Column("discount", sa.Numeric(precision=4, scale=2), nullable=False),
+        sa.Column("stock_quantity", sa.Integer(), nullable=False),
+        sa.Column("description", sa.String(length=1500), nullable=True),
+        sa.Column(
+            "images",
+            postgresql.ARRAY(sa.String(length=100)),
+            server_default="{}",
+            nullable=False,
+        ),
+        sa.Column("review_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "rate",
+            sa.Numeric(precision=3, scale=2),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("is_bestseller", sa.Boolean(), nullable=False),
+        sa.Column("is_publish", sa.Boolean(), nullable=False),
+        sa.Column("is_gifted", sa.Boolean(), nullable=False),
+        sa.Column("is_available", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("stats_updated_at", sa.DateTime(), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id"),
+    )
+    op.create_index(
+        "ix_catalog_books_actual_price_book_id",
+        "catalog_books",
+        ["actual_price", "book_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_catalog_books_created_at_book_id",
+        "catalog_books",
+        ["created_at", "book_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_catalog_books_rate_book_id",
+        "catalog_books",
+        ["rate", "book_id"],
+        unique=False,
+    )
+    # Заповнюємо каталог з наявних книг (далі його підтримує CatalogRefresher)
+    op.execute("""
+        INSERT INTO catalog_books (
+            book_id, title, author, original_title, genre,
+            categories, target_ages, book_type,
+            series, publisher, publication_year, page_count, paper_type,
+            language, original_language, translator, cover_type,
+            weight, dimensions, isbn, article_number,
+            price, actual_price, discount, stock_quantity, description,
+            images, review_count, rate,
+            is_bestseller, is_publish, is_gifted, is_available,
+            created_at, updated_at, stats_updated_at, refreshed_at
+        )
+        SELECT
+            b.id, b.title, b.author, bi.original_title, b.genre,
+            b.category_values, b.target_age_values, b.book_type_values,
+            bi.series, bi.publisher, bi.publication_year, bi.page_count,
+            bi.paper_type, b.language, b.original_language, bi.translator,
+            bi.cover_type, bi.weight, bi.dimensions, bi.isbn, bi.article_number,
+            b.price, b.actual_price, b.discount, b.stock_quantity, bi.description,
+            array_remove(array_agg(i.image_url), NULL),
+            coalesce(s.review_count, 0),
+            coalesce(s.avg_rate, 0),
+            b.is_bestseller, b.is_publish, b.is_gifted, b.is_available,
+            b.created_at, b.updated_at, s.updated_at, now()
+        FROM books b
+        LEFT JOIN books_info bi ON bi.book_id = b.id
+        LEFT JOIN book_rating_stats s ON s.book_id = b.id
+        LEFT JOIN images i ON i.book_id = b.id
+        GROUP BY b.id, bi.id, s.book_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_catalog_books_rate_book_id", table_name="catalog_books")
+    op.drop_index("ix_catalog_books_created_at_book_id", table_name="catalog_books")
+    op.drop_index("ix_catalog_books_actual_price_book_id", table_name="catalog_books")
+    op.drop_table("catalog_books")
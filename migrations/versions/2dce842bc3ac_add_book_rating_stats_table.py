@@ -0,0 +1,74 @@
+"""add_book_rating_stats_table
+
+Revision ID: 2dce842bc3ac
+Revises: 6f93487676ef
+Create Date: 2026-10-18 10:12:41.204117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2dce842bc3ac"
+down_revision: Union[str, None] = "6f93487676ef"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "book_rating_stats",
+        sa.Column("book_id", sa.UUID(), nullable=False),
+        sa.Column("review_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rate_sum", sa.Numeric(), server_default="0", nullable=False),
+        sa.Column(
+            "avg_rate",
+            sa.Numeric(precision=3, scale=2),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("stars_1", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("stars_2", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("stars_3", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("stars_4", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("stars_5", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id"),
+    )
+    op.create_index(
+        op.f("ix_book_rating_stats_avg_rate"),
+        "book_rating_stats",
+        ["avg_rate"],
+        unique=False,
+    )
+    # Заповнюємо статистику з уже наявних відгуків
+    op.execute("""
+        INSERT INTO book_rating_stats (
+            book_id, review_count, rate_sum, avg_rate,
+            stars_1, stars_2, stars_3, stars_4, stars_5, updated_at
+        )
+        SELECT
+            book_id,
+            count(id),
+            sum(rate),
+            round(avg(rate), 2),
+            count(id) FILTER (WHERE greatest(least(round(rate), 5), 1) = 1),
+            count(id) FILTER (WHERE greatest(least(round(rate), 5), 1) = 2),
+            count(id) FILTER (WHERE greatest(least(round(rate), 5), 1) = 3),
+            count(id) FILTER (WHERE greatest(least(round(rate), 5), 1) = 4),
+            count(id) FILTER (WHERE greatest(least(round(rate), 5), 1) = 5),
+            now()
+        FROM reviews
+        GROUP BY book_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_book_rating_stats_avg_rate"), table_name="book_rating_stats")
+    op.drop_table("book_rating_stats")
@@ -0,0 +1,47 @@
+"""add_book_id_value_indexes_for_filters
+
+Revision ID: 34f10fed1cab
+Revises: ad20bd692f1d
+Create Date: 2026-10-18 17:05:41.218730
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "34f10fed1cab"
+down_revision: Union[str, None] = "ad20bd692f1d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_categories_book_id_category",
+        "categories",
+        ["book_id", "category"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_target_ages_book_id_target_age",
+        "target_ages",
+        ["book_id", "target_age"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_book_types_book_id_book_type",
+        "book_types",
+        ["book_id", "book_type"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_book_types_book_id_book_type", table_name="book_types")
+    op.drop_index("ix_target_ages_book_id_target_age", table_name="target_ages")
+    op.drop_index("ix_categories_book_id_category", table_name="categories")
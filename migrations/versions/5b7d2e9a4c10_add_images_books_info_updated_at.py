@@ -0,0 +1,49 @@
+"""add_images_books_info_updated_at
+
+Revision ID: 5b7d2e9a4c10
+Revises: c3a8e5d17b42
+Create Date: 2026-10-18 19:48:03.771254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7d2e9a4c10"
+down_revision: Union[str, None] = "c3a8e5d17b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "images",
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.add_column(
+        "books_info",
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    # Порожні копії в catalog_books — перший sweep оновить усі рядки каталогу
+    op.add_column(
+        "catalog_books", sa.Column("info_updated_at", sa.DateTime(), nullable=True)
+    )
+    op.add_column(
+        "catalog_books", sa.Column("images_updated_at", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("catalog_books", "images_updated_at")
+    op.drop_column("catalog_books", "info_updated_at")
+    op.drop_column("books_info", "updated_at")
+    op.drop_column("images", "updated_at")
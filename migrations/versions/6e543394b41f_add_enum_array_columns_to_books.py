@@ -0,0 +1,96 @@
+"""add_enum_array_columns_to_books
+
+Revision ID: 6e543394b41f
+Revises: 90802dcb40e1
+Create Date: 2026-10-18 13:05:33.418820
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "6e543394b41f"
+down_revision: Union[str, None] = "90802dcb40e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (колонка в books, дочірня таблиця, колонка в дочірній таблиці, тип enum)
+ENUM_ARRAYS = (
+    ("category_values", "categories", "category", "categoriesenum"),
+    ("target_age_values", "target_ages", "target_age", "targetagesenum"),
+    ("book_type_values", "book_types", "book_type", "booktypeenum"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column, _, _, enum_name in ENUM_ARRAYS:
+        op.add_column(
+            "books",
+            sa.Column(
+                column,
+                postgresql.ARRAY(postgresql.ENUM(name=enum_name, create_type=False)),
+                server_default="{}",
+                nullable=False,
+            ),
+        )
+
+    assignments = ",\n".join(
+        f"{column} = ARRAY(SELECT DISTINCT {value} FROM {table} "
+        f"WHERE book_id = target_id ORDER BY 1)"
+        for column, table, value, _ in ENUM_ARRAYS
+    )
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION books_refresh_enum_arrays(target_id uuid)
+        RETURNS void LANGUAGE sql AS $$
+            UPDATE books SET
+            {assignments}
+            WHERE id = target_id
+        $$
+        """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_enum_arrays_on_change() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM books_refresh_enum_arrays(OLD.book_id);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM books_refresh_enum_arrays(NEW.book_id);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """)
+    for _, table, _, _ in ENUM_ARRAYS:
+        op.execute(f"""
+            CREATE TRIGGER {table}_sync_books_enum_arrays
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION books_enum_arrays_on_change()
+            """)
+
+    op.execute("SELECT books_refresh_enum_arrays(id) FROM books")
+
+    for column, _, _, _ in ENUM_ARRAYS:
+        op.create_index(
+            f"ix_books_{column}",
+            "books",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column, table, _, _ in ENUM_ARRAYS:
+        op.drop_index(f"ix_books_{column}", table_name="books")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_books_enum_arrays ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS books_enum_arrays_on_change()")
+    op.execute("DROP FUNCTION IF EXISTS books_refresh_enum_arrays(uuid)")
+    for column, _, _, _ in ENUM_ARRAYS:
+        op.drop_column("books", column)
@@ -0,0 +1,45 @@
+"""make_reviews_review_date_not_null
+
+Revision ID: 7a2c9e41f0b3
+Revises: e4f1a6c83d95
+Create Date: 2026-10-18 21:05:19.648302
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7a2c9e41f0b3"
+down_revision: Union[str, None] = "e4f1a6c83d95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Дата відгуку без значення — дата створення (або поточна, якщо й її немає)
+    op.execute(
+        "UPDATE reviews SET review_date = coalesce(created_at, now()) "
+        "WHERE review_date IS NULL"
+    )
+    op.alter_column(
+        "reviews",
+        "review_date",
+        existing_type=sa.DateTime(),
+        server_default=sa.func.now(),
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "reviews",
+        "review_date",
+        existing_type=sa.DateTime(),
+        server_default=None,
+        nullable=True,
+    )
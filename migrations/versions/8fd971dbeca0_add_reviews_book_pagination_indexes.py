@@ -0,0 +1,40 @@
+"""add_reviews_book_pagination_indexes
+
+Revision ID: 8fd971dbeca0
+Revises: 2dce842bc3ac
+Create Date: 2026-10-18 11:02:15.583920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8fd971dbeca0"
+down_revision: Union[str, None] = "2dce842bc3ac"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_reviews_book_id_review_date_id",
+        "reviews",
+        ["book_id", "review_date", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_reviews_book_id_rate",
+        "reviews",
+        ["book_id", "rate", "review_date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reviews_book_id_rate", table_name="reviews")
+    op.drop_index("ix_reviews_book_id_review_date_id", table_name="reviews")
@@ -0,0 +1,138 @@
+"""add_books_search_vector_and_trgm_indexes
+
+Revision ID: 90802dcb40e1
+Revises: e15c28ee18fa
+Create Date: 2026-10-18 12:21:07.914532
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "90802dcb40e1"
+down_revision: Union[str, None] = "e15c28ee18fa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "books", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True)
+    )
+
+    # Ваги: A — назва й автор, B — оригінальна назва, C — серія, D — видавництво.
+    # 'simple' покриває український текст, 'english' додає англійські стеми.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_search_vector(
+            p_title text,
+            p_author text,
+            p_original_title text,
+            p_series text,
+            p_publisher text
+        ) RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+            SELECT
+                setweight(to_tsvector('simple', coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(p_author, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(p_original_title, '')), 'B')
+                || setweight(to_tsvector('english', coalesce(p_original_title, '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(p_series, '')), 'C')
+                || setweight(to_tsvector('simple', coalesce(p_publisher, '')), 'D')
+        $$
+        """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_search_vector_on_books() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            SELECT books_search_vector(
+                NEW.title, NEW.author, bi.original_title, bi.series, bi.publisher
+            )
+            INTO NEW.search_vector
+            FROM (SELECT 1) AS one
+            LEFT JOIN books_info bi ON bi.book_id = NEW.id;
+            RETURN NEW;
+        END
+        $$
+        """)
+    op.execute("""
+        CREATE TRIGGER books_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, author ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_on_books()
+        """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_search_vector_on_books_info() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            target_id uuid := CASE WHEN TG_OP = 'DELETE' THEN OLD.book_id ELSE NEW.book_id END;
+        BEGIN
+            UPDATE books b
+            SET search_vector = books_search_vector(
+                b.title, b.author, bi.original_title, bi.series, bi.publisher
+            )
+            FROM (SELECT 1) AS one
+            LEFT JOIN books_info bi ON bi.book_id = target_id AND TG_OP <> 'DELETE'
+            WHERE b.id = target_id;
+            RETURN NULL;
+        END
+        $$
+        """)
+    op.execute("""
+        CREATE TRIGGER books_info_search_vector_update
+        AFTER INSERT OR UPDATE OR DELETE ON books_info
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_on_books_info()
+        """)
+
+    op.execute("""
+        UPDATE books b
+        SET search_vector = books_search_vector(
+            b.title, b.author, bi.original_title, bi.series, bi.publisher
+        )
+        FROM books b2
+        LEFT JOIN books_info bi ON bi.book_id = b2.id
+        WHERE b2.id = b.id
+        """)
+
+    op.create_index(
+        "ix_books_search_vector",
+        "books",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_books_title_trgm",
+        "books",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_books_author_trgm",
+        "books",
+        ["author"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"author": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_author_trgm", table_name="books")
+    op.drop_index("ix_books_title_trgm", table_name="books")
+    op.drop_index("ix_books_search_vector", table_name="books")
+    op.execute("DROP TRIGGER IF EXISTS books_info_search_vector_update ON books_info")
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector_update ON books")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_on_books_info()")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_on_books()")
+    op.execute(
+        "DROP FUNCTION IF EXISTS books_search_vector(text, text, text, text, text)"
+    )
+    op.drop_column("books", "search_vector")
@@ -0,0 +1,28 @@
+"""add_images_book_id_index
+
+Revision ID: 9d4b3f7e2a61
+Revises: 7a2c9e41f0b3
+Create Date: 2026-10-18 21:32:54.180736
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4b3f7e2a61"
+down_revision: Union[str, None] = "7a2c9e41f0b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_images_book_id"), "images", ["book_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_images_book_id"), table_name="images")
@@ -0,0 +1,37 @@
+"""add_catalog_books_isbn_article_indexes
+
+Revision ID: ad20bd692f1d
+Revises: b180208956a5
+Create Date: 2026-10-18 16:20:09.655102
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "ad20bd692f1d"
+down_revision: Union[str, None] = "b180208956a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_catalog_books_isbn"), "catalog_books", ["isbn"], unique=False
+    )
+    op.create_index(
+        op.f("ix_catalog_books_article_number"),
+        "catalog_books",
+        ["article_number"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_catalog_books_article_number"), table_name="catalog_books")
+    op.drop_index(op.f("ix_catalog_books_isbn"), table_name="catalog_books")
@@ -0,0 +1,33 @@
+"""add_catalog_books_refreshed_at_index
+
+Revision ID: b180208956a5
+Revises: 29b9b3cf59ac
+Create Date: 2026-10-18 15:11:48.207346
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b180208956a5"
+down_revision: Union[str, None] = "29b9b3cf59ac"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_catalog_books_refreshed_at"),
+        "catalog_books",
+        ["refreshed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_catalog_books_refreshed_at"), table_name="catalog_books")
@@ -0,0 +1,35 @@
+"""bump_catalog_version_on_reviewer_changes
+
+Revision ID: b62f08d4c7e5
+Revises: 9d4b3f7e2a61
+Create Date: 2026-10-18 21:58:26.417093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b62f08d4c7e5"
+down_revision: Union[str, None] = "9d4b3f7e2a61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ім'я та аватар автора показуються в превʼю відгуків у списках книг, а
+    # видалений користувач зникає з них — обидва змінюють версію каталогу.
+    # UPDATE OF спрацьовує лише коли колонка є в SET, тож вхід і токени не рахуються
+    op.execute("""
+        CREATE TRIGGER users_bump_catalog_version
+        AFTER UPDATE OF first_name, avatar OR DELETE ON users
+        FOR EACH STATEMENT EXECUTE FUNCTION catalog_state_bump_version()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS users_bump_catalog_version ON users")
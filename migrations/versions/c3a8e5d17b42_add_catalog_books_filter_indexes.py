@@ -0,0 +1,68 @@
+"""add_catalog_books_filter_indexes
+
+Revision ID: c3a8e5d17b42
+Revises: 34f10fed1cab
+Create Date: 2026-10-18 19:12:36.504187
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a8e5d17b42"
+down_revision: Union[str, None] = "34f10fed1cab"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_catalog_books_categories",
+        "catalog_books",
+        ["categories"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_catalog_books_target_ages",
+        "catalog_books",
+        ["target_ages"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_catalog_books_book_type",
+        "catalog_books",
+        ["book_type"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_catalog_books_title_trgm",
+        "catalog_books",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_catalog_books_author_trgm",
+        "catalog_books",
+        ["author"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"author": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_catalog_books_author_trgm", table_name="catalog_books")
+    op.drop_index("ix_catalog_books_title_trgm", table_name="catalog_books")
+    op.drop_index("ix_catalog_books_book_type", table_name="catalog_books")
+    op.drop_index("ix_catalog_books_target_ages", table_name="catalog_books")
+    op.drop_index("ix_catalog_books_categories", table_name="catalog_books")
@@ -0,0 +1,41 @@
+"""add_actual_price_column_to_books
+
+Revision ID: e15c28ee18fa
+Revises: 8fd971dbeca0
+Create Date: 2026-10-18 11:40:52.310644
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e15c28ee18fa"
+down_revision: Union[str, None] = "8fd971dbeca0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED generated column: PostgreSQL заповнює її для наявних рядків під час ADD COLUMN
+    op.add_column(
+        "books",
+        sa.Column(
+            "actual_price",
+            sa.Numeric(),
+            sa.Computed("round(price * (1.0 - discount), 0)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        op.f("ix_books_actual_price"), "books", ["actual_price"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_books_actual_price"), table_name="books")
+    op.drop_column("books", "actual_price")
@@ -0,0 +1,61 @@
+"""add_catalog_state_version
+
+Revision ID: e4f1a6c83d95
+Revises: 5b7d2e9a4c10
+Create Date: 2026-10-18 20:21:47.305918
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e4f1a6c83d95"
+down_revision: Union[str, None] = "5b7d2e9a4c10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalog_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO catalog_state (id, version) VALUES (1, 0)")
+
+    # Тригер на рівні інструкції: один пакет оновлень каталогу — одне збільшення
+    op.execute("""
+        CREATE OR REPLACE FUNCTION catalog_state_bump_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE catalog_state SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END
+        $$
+        """)
+    op.execute("""
+        CREATE TRIGGER catalog_books_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON catalog_books
+        FOR EACH STATEMENT EXECUTE FUNCTION catalog_state_bump_version()
+        """)
+
+    # Версію каталогу більше не рахують через max(refreshed_at)
+    op.drop_index(op.f("ix_catalog_books_refreshed_at"), table_name="catalog_books")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_catalog_books_refreshed_at"),
+        "catalog_books",
+        ["refreshed_at"],
+        unique=False,
+    )
+    op.execute("DROP TRIGGER IF EXISTS catalog_books_bump_version ON catalog_books")
+    op.execute("DROP FUNCTION IF EXISTS catalog_state_bump_version()")
+    op.drop_table("catalog_state")